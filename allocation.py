@@ -0,0 +1,252 @@
+import os
+import io
+import time
+import argparse
+
+import pandas as pd
+import streamlit as st
+
+import clients
+import assignment
+from state_db import STATE_DIR, connect, init
+
+DB_PATH = os.path.join(STATE_DIR, "allocation.sqlite3")
+LEASE_TTL = 3 * 60 * 60  # a session has this long to finish before its images go back
+EXPORT_INTERVAL = 5 * 60
+EXPORT_JOB = "allocation:export_job"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    country TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    frequency INTEGER NOT NULL,
+    PRIMARY KEY (country, position)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    session_id TEXT NOT NULL,
+    country TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (session_id, country, position)
+);
+CREATE INDEX IF NOT EXISTS leases_by_expiry ON leases (expires_at);
+CREATE TABLE IF NOT EXISTS exports (
+    country TEXT PRIMARY KEY,
+    dirty INTEGER NOT NULL,
+    exported_at REAL NOT NULL
+);
+"""
+
+
+class Allocator:
+    """
+    Hands out `<Country>_hs.csv` image slots to survey sessions. A slot is a
+    CSV row (identified by its position, since some paths appear on several rows).
+
+    reserve() leases n images to a session (leases expire after `ttl`, so an
+    abandoned session gives its images back) and commit() turns the leases
+    into `frequency` decrements. Both run in one SQLite write transaction,
+    so concurrent sessions never double-book a slot or lose a decrement.
+    The CSV on GitHub becomes an export of this table (see export_csv()).
+    """
+
+    def __init__(self, path=DB_PATH, ttl=LEASE_TTL):
+        self.path = path
+        self.ttl = ttl
+        init(path, SCHEMA)
+
+    def _connect(self):
+        return connect(self.path)
+
+    def has_country(self, country):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM slots WHERE country = ? LIMIT 1", (country,)).fetchone() is not None
+
+    def seed(self, country, df):
+        """
+        Load a `file_path,frequency` frame for `country` unless it is already loaded
+        """
+        rows = [(country, path, position, int(freq)) for position, (path, freq) in enumerate(zip(df["file_path"], df["frequency"]))]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM slots WHERE country = ? LIMIT 1", (country,)).fetchone() is None:
+                conn.executemany("INSERT INTO slots (country, file_path, position, frequency) VALUES (?, ?, ?, ?)", rows)
+                conn.execute("INSERT OR REPLACE INTO exports (country, dirty, exported_at) VALUES (?, 0, ?)", (country, time.time()))
+
+    def _available(self, conn, country):
+        # Remaining frequency minus what live sessions are currently holding
+        return conn.execute("""
+            SELECT s.file_path, s.position, s.frequency - COUNT(l.position) AS available
+            FROM slots s LEFT JOIN leases l ON l.country = s.country AND l.position = s.position
+            WHERE s.country = ?
+            GROUP BY s.position
+            HAVING available > 0
+            ORDER BY s.position
+        """, (country,)).fetchall()
+
+    def reserve(self, country, session_id, n, seed=None):
+        """
+        Lease up to `n` images of `country` to `session_id` and return their
+        paths. The images are drawn by assignment.draw() from what is still
+        available. Calling it again for the same session returns the same images.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            held = conn.execute(
+                "SELECT file_path FROM leases WHERE session_id = ? AND country = ? ORDER BY position",
+                (session_id, country)
+            ).fetchall()
+            if held:
+                conn.execute("UPDATE leases SET expires_at = ? WHERE session_id = ? AND country = ?", (now + self.ttl, session_id, country))
+                return [row[0] for row in held]
+            available = pd.DataFrame(self._available(conn, country), columns=["file_path", "position", "available"])
+            selected = available.loc[assignment.draw(available, n, seed)].sort_values("position")
+            conn.executemany(
+                "INSERT INTO leases (session_id, country, file_path, position, expires_at) VALUES (?, ?, ?, ?, ?)",
+                [(session_id, country, path, int(position), now + self.ttl) for path, position in zip(selected["file_path"], selected["position"])]
+            )
+            return list(selected["file_path"])
+
+    def renew(self, country, session_id):
+        with self._connect() as conn:
+            conn.execute("UPDATE leases SET expires_at = ? WHERE session_id = ? AND country = ?", (time.time() + self.ttl, session_id, country))
+
+    def lease(self, country, session_id, file_paths):
+        """
+        (Re)lease `file_paths` to `session_id`, e.g. the images of a resumed
+        session whose leases may have expired meanwhile: live leases are
+        renewed and missing ones are taken again (on the path's slot with the
+        most capacity left). Paths without a slot (control images) or with no
+        capacity left are skipped.
+        Returns the number of leases inserted.
+        """
+        now = time.time()
+        inserted = 0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            conn.execute("UPDATE leases SET expires_at = ? WHERE session_id = ? AND country = ?", (now + self.ttl, session_id, country))
+            held = {row[0] for row in conn.execute(
+                "SELECT file_path FROM leases WHERE session_id = ? AND country = ?", (session_id, country)
+            )}
+            for path in file_paths:
+                if path in held:
+                    continue
+                row = conn.execute("""
+                    SELECT s.position FROM slots s
+                    LEFT JOIN leases l ON l.country = s.country AND l.position = s.position
+                    WHERE s.country = ? AND s.file_path = ?
+                    GROUP BY s.position
+                    HAVING s.frequency - COUNT(l.position) > 0
+                    ORDER BY s.frequency - COUNT(l.position) DESC
+                    LIMIT 1
+                """, (country, path)).fetchone()
+                if row is None:
+                    continue
+                conn.execute(
+                    "INSERT INTO leases (session_id, country, file_path, position, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, country, path, row[0], now + self.ttl)
+                )
+                held.add(path)
+                inserted += 1
+        return inserted
+
+    def commit(self, country, session_id):
+        """
+        Turn the session's leases into frequency decrements. Returns the number
+        of slots consumed (0 if the session already committed or expired).
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            positions = [row[0] for row in conn.execute(
+                "SELECT position FROM leases WHERE session_id = ? AND country = ?", (session_id, country)
+            )]
+            conn.executemany(
+                "UPDATE slots SET frequency = frequency - 1 WHERE country = ? AND position = ? AND frequency > 0",
+                [(country, position) for position in positions]
+            )
+            conn.execute("DELETE FROM leases WHERE session_id = ? AND country = ?", (session_id, country))
+            if positions:
+                conn.execute("UPDATE exports SET dirty = 1 WHERE country = ?", (country,))
+            return len(positions)
+
+    def release(self, country, session_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM leases WHERE session_id = ? AND country = ?", (session_id, country))
+
+    def snapshot(self, country):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT file_path, frequency FROM slots WHERE country = ? ORDER BY position", (country,)).fetchall()
+        return pd.DataFrame(rows, columns=["file_path", "frequency"])
+
+    def export_csv(self, country):
+        csv_buffer = io.StringIO()
+        self.snapshot(country).to_csv(csv_buffer, index=False)
+        return csv_buffer.getvalue()
+
+    def claim_export(self, country, interval=EXPORT_INTERVAL):
+        """
+        True if `country` has unexported decrements and the last export is
+        older than `interval`; the caller is then responsible for exporting.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            claimed = conn.execute(
+                "UPDATE exports SET dirty = 0, exported_at = ? WHERE country = ? AND dirty = 1 AND exported_at < ?",
+                (now, country, now - interval)
+            ).rowcount
+            return claimed == 1
+
+    def mark_dirty(self, country):
+        with self._connect() as conn:
+            conn.execute("UPDATE exports SET dirty = 1 WHERE country = ?", (country,))
+
+
+@st.cache_resource(show_spinner=False)
+def get_allocator():
+    return Allocator()
+
+
+def _push_export(allocator, country):
+    try:
+        clients.update_csv(country, allocator.export_csv(country), message=f"Export {country} allocation counts")
+    except Exception:
+        allocator.mark_dirty(country)
+        raise
+
+
+def export_to_github(allocator, country, interval=EXPORT_INTERVAL, queue=None):
+    """
+    Push the current counts to `<country>_hs.csv`, at most once per `interval`.
+    With a write-behind `queue` the push is journaled and made by its workers.
+    """
+    if not allocator.claim_export(country, interval):
+        return False
+    if queue is not None:
+        queue.submit(EXPORT_JOB, {"country": country}, key=f"export/{country}")
+    else:
+        _push_export(allocator, country)
+    return True
+
+
+def export_job(payload):
+    # Write-behind handler; the CSV is rendered when the job runs, so a retry pushes the latest counts
+    _push_export(get_allocator(), payload["country"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export the image allocation table")
+    parser.add_argument("country")
+    parser.add_argument("--push", action="store_true", help="commit the CSV to GitHub instead of printing it")
+    args = parser.parse_args()
+    allocator = Allocator()
+    if args.push:
+        allocator.mark_dirty(args.country)
+        export_to_github(allocator, args.country, interval=0)
+    else:
+        print(allocator.export_csv(args.country), end="")
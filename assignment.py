@@ -0,0 +1,26 @@
+import numpy as np
+
+
+def draw(frame, n, seed):
+    """
+    Pick up to `n` rows of `frame` (columns `file_path`, `available`) by
+    weighted sampling without replacement, weighted by the remaining count.
+
+    Images with the most annotations still owed are the most likely to be
+    drawn, so counts drain evenly across the whole CSV instead of the head
+    being exhausted while the tail is never shown. Rows sharing a path count
+    as one candidate, so a session never sees the same image twice.
+    Returns the index labels of the selected rows.
+    """
+    eligible = frame[frame["available"] > 0]
+    weights = eligible.groupby("file_path", sort=False)["available"].sum()
+    if weights.empty:
+        return eligible.index
+    rng = np.random.default_rng(seed)
+    # Efraimidis-Spirakis: the n largest u ** (1 / w) form a weighted sample
+    # without replacement; compared in log space to stay exact for big weights
+    keys = np.log(rng.random(len(weights))) / weights.to_numpy()
+    chosen = weights.index[np.argsort(-keys)[:n]]
+    # Take the first row with capacity for each chosen path
+    picked = eligible[eligible["file_path"].isin(chosen)].drop_duplicates("file_path")
+    return picked.index
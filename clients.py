@@ -0,0 +1,147 @@
+import time
+import threading
+
+import requests
+import streamlit as st
+import firebase_admin
+from firebase_admin import credentials
+from firebase_admin import firestore
+from github import Github
+from github import GithubException
+from github import GithubRetry
+from google.api_core import exceptions as google_exceptions
+from google.auth import exceptions as auth_exceptions
+
+import http_client
+
+# Clients are built once per server process and shared by every session,
+# so a rerun does not pay for credential parsing or GitHub round-trips.
+CLIENT_TTL = 60 * 60
+BLOB_TTL = 5 * 60
+REFRESH_COOLDOWN = 10  # seconds; workers failing together refresh the clients once
+BRANCH = "main"
+# Failures that mean a cached client is unusable (expired credentials, dead connection)
+STALE_CLIENT_ERRORS = (
+    google_exceptions.Unauthenticated,
+    google_exceptions.ServiceUnavailable,
+    auth_exceptions.RefreshError,
+    auth_exceptions.TransportError,
+    requests.ConnectionError,
+)
+# Serializes building and deleting the Firebase app (write-behind workers can refresh concurrently)
+_refresh_lock = threading.Lock()
+_refreshed_at = float("-inf")
+
+
+def get_secrets():
+    return st.secrets["firebase"]
+
+
+def get_cred_dict(firebase_secrets):
+    return {
+        "type": firebase_secrets["type"],
+        "project_id": firebase_secrets["project_id"],
+        "private_key_id": firebase_secrets["private_key_id"],
+        "private_key": firebase_secrets["private_key"].replace("\\n", "\n"),  # Fix multi-line key
+        "client_email": firebase_secrets["client_email"],
+        "client_id": firebase_secrets["client_id"],
+        "auth_uri": firebase_secrets["auth_uri"],
+        "token_uri": firebase_secrets["token_uri"],
+        "auth_provider_x509_cert_url": firebase_secrets["auth_provider_x509_cert_url"],
+        "client_x509_cert_url": firebase_secrets["client_x509_cert_url"],
+        "universe_domain": firebase_secrets["universe_domain"],
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_db():
+    """
+    Firestore client shared by all sessions of this server process. It
+    renews its own access tokens, so it is only rebuilt by refresh().
+    """
+    with _refresh_lock:
+        # Initialize Firebase (only if not already initialized)
+        if not firebase_admin._apps:
+            cred = credentials.Certificate(get_cred_dict(get_secrets()))
+            firebase_admin.initialize_app(cred)
+        return firestore.client()
+
+
+@st.cache_resource(ttl=CLIENT_TTL, show_spinner=False)
+def get_repo():
+    """
+    PyGithub handle on the study repository
+    """
+    firebase_secrets = get_secrets()
+    # Same pool size and retry budget as http_client; GithubRetry also waits out rate limits
+    g = Github(firebase_secrets["github_token"], timeout=http_client.TIMEOUT[1], pool_size=http_client.POOL_SIZE,
+               retry=GithubRetry(total=http_client.MAX_RETRIES))
+    return g.get_repo(firebase_secrets["github_repo"])
+
+
+@st.cache_resource(ttl=BLOB_TTL, show_spinner=False)
+def get_csv_blob(country):
+    """
+    Contents metadata (sha, size, ...) of `<country>_hs.csv` on the study branch
+    """
+    return get_repo().get_contents(f"{country}_hs.csv", ref=BRANCH)
+
+
+def refresh(cooldown=0):
+    """
+    Drop every cached client; the next call rebuilds them. The Firebase app
+    is deleted too, as firestore.client() would otherwise hand back the same
+    client. Returns False (and does nothing) if the clients were already
+    refreshed less than `cooldown` seconds ago.
+    """
+    global _refreshed_at
+    with _refresh_lock:
+        if time.monotonic() - _refreshed_at < cooldown:
+            return False
+        if firebase_admin._apps:
+            firebase_admin.delete_app(firebase_admin.get_app())
+        get_db.clear()
+        get_repo.clear()
+        get_csv_blob.clear()
+        _refreshed_at = time.monotonic()
+    return True
+
+
+def refresh_on_error(e):
+    """
+    Rebuild the clients if `e` says the cached ones went stale; the caller re-raises
+    """
+    stale = isinstance(e, STALE_CLIENT_ERRORS) or (isinstance(e, GithubException) and e.status == 401)
+    # Errors from requests made with the old clients do not rebuild the new ones again
+    if stale and refresh(cooldown=REFRESH_COOLDOWN):
+        print(f"Refreshed clients after: {e!r}")
+    return stale
+
+
+def update_csv(country, content, message="Updated CSV via Streamlit app"):
+    """
+    Write `<country>_hs.csv` using the cached blob sha. A stale sha (someone
+    else committed since it was fetched) refreshes the metadata and retries once.
+    """
+    for attempt in range(2):
+        try:
+            file_content = get_csv_blob(country)
+            result = get_repo().update_file(
+                path=f"{country}_hs.csv",
+                message=message,
+                content=content,
+                sha=file_content.sha,
+                branch=BRANCH
+            )
+        except GithubException as e:
+            get_csv_blob.clear()
+            if attempt or e.status not in (409, 422):
+                refresh_on_error(e)
+                raise
+            continue
+        except requests.ConnectionError as e:
+            refresh_on_error(e)
+            raise
+        # The blob we cached is now outdated
+        get_csv_blob.clear()
+        return result
@@ -0,0 +1,99 @@
+import os
+import glob
+import hashlib
+import argparse
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from PIL import ImageOps
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, ".cache", "derivatives")
+DISPLAY_SIZE = 800  # long edge in px
+QUALITY = 82
+FORMATS = {"JPEG": "jpg", "WEBP": "webp"}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def source_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def derivative_path(digest, size=DISPLAY_SIZE, fmt="JPEG", cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, digest[:2], f"{digest}_{size}.{FORMATS[fmt]}")
+
+
+def render(data, size=DISPLAY_SIZE, fmt="JPEG", quality=QUALITY):
+    """
+    Downscale an encoded image so its long edge is at most `size` px and
+    re-encode it as progressive JPEG (or WebP)
+    """
+    image = Image.open(BytesIO(data))
+    # Let the JPEG decoder skip DCT scales we would throw away anyway
+    image.draft("RGB", (size, size))
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((size, size), Image.LANCZOS)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    out = BytesIO()
+    if fmt == "WEBP":
+        image.save(out, "WEBP", quality=quality, method=4)
+    else:
+        image.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def display_bytes(data, size=DISPLAY_SIZE, fmt="JPEG", cache=True, cache_dir=CACHE_DIR):
+    """
+    Return the display-sized variant of `data`. With `cache`, variants are
+    stored on disk keyed by the hash of the source bytes.
+    """
+    if not cache:
+        return render(data, size, fmt)
+    path = derivative_path(source_hash(data), size, fmt, cache_dir)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    out = render(data, size, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{id(out)}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(out)
+    os.replace(tmp, path)
+    return out
+
+
+def pregenerate(folders, size=DISPLAY_SIZE, fmt="JPEG", workers=os.cpu_count(), cache_dir=CACHE_DIR):
+    """
+    Build display variants for every image in `folders`
+    """
+    files = []
+    for folder in folders:
+        files += sorted(f for f in glob.glob(os.path.join(folder, "*")) if f.lower().endswith(IMAGE_EXTENSIONS))
+
+    def _one(file):
+        with open(file, "rb") as f:
+            data = f.read()
+        return len(data), len(display_bytes(data, size, fmt, cache_dir=cache_dir))
+
+    source_bytes = derived_bytes = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for src, dst in executor.map(_one, files):
+            source_bytes += src
+            derived_bytes += dst
+    return len(files), source_bytes, derived_bytes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate display-sized image variants")
+    parser.add_argument("folders", nargs="*", help="image folders (default: wikimedia_*_images)")
+    parser.add_argument("--size", type=int, default=DISPLAY_SIZE)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="JPEG")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    folders = args.folders or sorted(glob.glob(os.path.join(BASE_DIR, "wikimedia_*_images")))
+    count, source_bytes, derived_bytes = pregenerate(folders, args.size, args.format, args.workers)
+    print(f"{count} images: {source_bytes / 1e6:.1f} MB -> {derived_bytes / 1e6:.1f} MB")
@@ -0,0 +1,150 @@
+import struct
+from io import BytesIO
+from datetime import datetime
+
+from PIL import Image
+
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+DATETIME = 0x0132
+DATETIME_ORIGINAL = 0x9003
+# Tags that identify the photographer or the device rather than describe the photo
+IDENTIFYING_TAGS = (
+    0x013B,  # Artist
+    0x8298,  # Copyright
+    0x927C,  # MakerNote
+    0xA420,  # ImageUniqueID
+    0xA430,  # CameraOwnerName
+    0xA431,  # BodySerialNumber
+    0xA435,  # LensSerialNumber
+)
+MONTHS = ["January", "February", "March", "April", "May", "June",
+          "July", "August", "September", "October", "November", "December"]
+XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+
+
+def _rational(value):
+    return float(value[0]) / float(value[1]) if isinstance(value, tuple) else float(value)
+
+
+def _degrees(dms, ref):
+    degrees = _rational(dms[0]) + _rational(dms[1]) / 60 + _rational(dms[2]) / 3600
+    return -degrees if ref in ("S", "W") else degrees
+
+
+def read_exif(data):
+    """
+    {"taken_at": datetime, "lat": float, "lng": float} from the photo's EXIF
+    (values it does not carry are None). Only the header segments are parsed;
+    the pixels are never decoded.
+    """
+    result = {"taken_at": None, "lat": None, "lng": None}
+    try:
+        exif = Image.open(BytesIO(data)).getexif()
+    except Exception:
+        return result
+
+    stamp = exif.get_ifd(EXIF_IFD).get(DATETIME_ORIGINAL) or exif.get(DATETIME)
+    try:
+        result["taken_at"] = datetime.strptime(str(stamp).strip("\x00 "), "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        pass
+
+    gps = exif.get_ifd(GPS_IFD)
+    try:
+        lat = _degrees(gps[2], gps.get(1))
+        lng = _degrees(gps[4], gps.get(3))
+        if -90 <= lat <= 90 and -180 <= lng <= 180 and (lat, lng) != (0, 0):
+            result["lat"], result["lng"] = lat, lng
+    except (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError):
+        pass
+    return result
+
+
+def taken_month_year(exif):
+    """
+    The month/year answers matching the photo's timestamp, or (None, None)
+    """
+    taken_at = exif["taken_at"]
+    if taken_at is None:
+        return None, None
+    return MONTHS[taken_at.month - 1], str(taken_at.year)
+
+
+def _clean_exif(payload):
+    exif = Image.Exif()
+    exif.load(payload)
+    # get_ifd() materializes the sub-IFD so tobytes() writes the edited copy
+    exif_ifd = exif.get_ifd(EXIF_IFD)
+    for tag in IDENTIFYING_TAGS:
+        exif.pop(tag, None)
+        exif_ifd.pop(tag, None)
+    exif.pop(GPS_IFD, None)
+    cleaned = exif.tobytes()
+    # Recent Pillow versions already include the APP1 "Exif\0\0" header
+    return cleaned if cleaned.startswith(b"Exif\x00\x00") else b"Exif\x00\x00" + cleaned
+
+
+def _strip_jpeg(data):
+    out = [data[:2]]
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xDA:  # start of scan: the rest is entropy-coded image data
+            break
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        segment = data[pos:pos + 2 + length]
+        body = segment[4:]
+        if marker == 0xE1 and body.startswith(b"Exif\x00\x00"):
+            cleaned = _clean_exif(body[6:])
+            segment = b"\xff\xe1" + struct.pack(">H", len(cleaned) + 2) + cleaned
+        elif (marker == 0xE1 and body.startswith(XMP_HEADER)) or marker == 0xED:
+            # XMP and IPTC (APP13) can repeat the GPS position and device details
+            segment = b""
+        out.append(segment)
+        pos += 2 + length
+    out.append(data[pos:])
+    return b"".join(out)
+
+
+def _strip_png(data):
+    out = [data[:8]]
+    pos = 8
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        end = pos + 12 + length
+        if kind not in (b"eXIf", b"iTXt", b"tEXt", b"zTXt"):
+            out.append(data[pos:end])
+        pos = end
+    return b"".join(out)
+
+
+def _reencode(data):
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise ValueError(f"Cannot decode the image to strip its metadata: {e}") from e
+    # Pillow only writes the EXIF / XMP passed to save(), so none of it is kept
+    out = BytesIO()
+    image.save(out, image.format, quality=95)
+    return out.getvalue()
+
+
+def strip_metadata(data):
+    """
+    `data` without GPS and identifying EXIF tags (and XMP / PNG text chunks).
+    The image data itself is copied byte for byte, not re-encoded; JPEGs keep
+    their timestamp and orientation. Unknown formats are returned as-is.
+    A JPEG or PNG whose header cannot be edited in place is re-encoded
+    without metadata; ValueError if it cannot be decoded either.
+    """
+    try:
+        if data[:2] == b"\xff\xd8":
+            return _strip_jpeg(data)
+        if data[:8] == b"\x89PNG\r\n\x1a\n":
+            return _strip_png(data)
+    except Exception:
+        # Never store the location because the header was odd
+        return _reencode(data)
+    return data
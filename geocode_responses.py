@@ -0,0 +1,126 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import clients
+from geocoding import GAZETTEER_PATH, NOT_FOUND, build_geocoder, normalize_query
+from profiles import load_profiles
+from response_sink import read_responses, response_ref
+
+COLLECTION = "Image_procurement"
+WORKERS = 8
+BATCH_SIZE = 500  # Firestore's limit on writes per batch
+
+
+def country_by_folder():
+    """
+    images_dir -> country for every procurement profile; the study country
+    is not stored on the response, but its image path starts with the folder
+    """
+    return {profile["images_dir"]: profile["country"] for profile in load_profiles("procure").values()}
+
+
+def response_country(response, folders):
+    path = response.get("image_url") or ""
+    # image_url is the repo-style path under whatever the storage put in front of it
+    # (github.com/<owner>/<repo>/blob/main/, s3://<bucket>/<prefix>/, a local root)
+    parts = path.split("/")
+    return folders.get(parts[-2]) if len(parts) >= 2 else None
+
+
+def collect(db, force=False):
+    """
+    Sessions that have responses still needing coordinates, as
+    [(snapshot, responses, [(response index, location_text, country)])]
+    """
+    folders = country_by_folder()
+    pending = []
+    for snapshot in db.collection(COLLECTION).stream():
+        responses = read_responses(snapshot)
+        todo = []
+        for i, response in enumerate(responses):
+            text = (response.get("location_text") or "").strip()
+            country = response_country(response, folders)
+            if not text or country is None:
+                continue
+            # Map picks carry coordinates; geocoded_name marks answers this job already did
+            if (response.get("lat") is not None or "geocoded_name" in response) and not force:
+                continue
+            todo.append((i, text, country))
+        if todo:
+            pending.append((snapshot, responses, todo))
+    return pending
+
+
+def geocode_all(geocoder, queries, workers=WORKERS):
+    """
+    Geocode unique (location_text, country) pairs in parallel. Cached and
+    gazetteer answers come back at once; Nominatim calls are paced by the
+    geocoder's token bucket however many workers are waiting, so the
+    geocoder should be built with rate_wait=None (workers queue for a slot
+    instead of giving up as "busy").
+    """
+    unique = {}
+    for text, country in queries:
+        unique.setdefault(normalize_query(text, country), (text, country))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda query: geocoder.geocode(*query), unique.values())
+        return dict(zip(unique, results))
+
+
+def write_back(db, pending, results, dry_run=False, record_misses=True, batch_size=BATCH_SIZE):
+    """
+    Add lat/lng/geocoded_name to each response, `batch_size` writes per
+    batch: one update per answer document, or a rewrite of the `responses`
+    array for sessions stored the old way. Without `record_misses`, "not
+    found" answers are left for a later run too (an offline-only miss may
+    still be found by Nominatim).
+    """
+    writes = []
+    located = 0
+    for snapshot, responses, todo in pending:
+        changed = []
+        for i, text, country in todo:
+            result = results[normalize_query(text, country)]
+            # Timeouts and outages are left for the next run
+            if not result["success"] and not (record_misses and result["error"] == NOT_FOUND):
+                continue
+            coordinates = {"lat": result["lat"], "lng": result["lng"], "geocoded_name": result["name"]}
+            responses[i].update(coordinates)
+            located += result["success"]
+            changed.append((responses[i], coordinates))
+        if not changed:
+            continue
+        if "index" in responses[0]:
+            # Answers written one document each (see response_sink.py)
+            writes += [(response_ref(snapshot.reference, response["index"]), coordinates) for response, coordinates in changed]
+        else:
+            writes.append((snapshot.reference, {"responses": responses}))
+
+    if not dry_run:
+        for start in range(0, len(writes), batch_size):
+            batch = db.batch()
+            for ref, fields in writes[start:start + batch_size]:
+                batch.update(ref, fields)
+            batch.commit()
+    return len(writes), located
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"Add coordinates to the location_text answers in {COLLECTION}")
+    parser.add_argument("--force", action="store_true", help="re-geocode responses that already have coordinates")
+    parser.add_argument("--offline", action="store_true", help="only use the offline gazetteer")
+    parser.add_argument("--gazetteer", default=GAZETTEER_PATH, help="name,country,lat,lng CSV (e.g. a GeoNames extract) tried before Nominatim")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--dry-run", action="store_true", help="geocode but do not write to Firestore")
+    args = parser.parse_args()
+
+    db = clients.get_db()
+    pending = collect(db, force=args.force)
+    queries = [(text, country) for _, _, todo in pending for _, text, country in todo]
+    # Nobody is waiting on a page here, so lookups queue for Nominatim instead of timing out
+    geocoder = build_geocoder(offline=args.offline or None, gazetteer=args.gazetteer, rate_wait=None)
+    results = geocode_all(geocoder, queries, workers=args.workers)
+    found = sum(result["success"] for result in results.values())
+    print(f"{len(queries)} responses in {len(pending)} documents, {len(results)} unique locations, {found} found")
+    updated, located = write_back(db, pending, results, dry_run=args.dry_run, record_misses=not args.offline)
+    print(f"{'Would write' if args.dry_run else 'Wrote'} {updated} updates ({located} responses located)")
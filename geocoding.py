@@ -0,0 +1,229 @@
+import os
+import re
+import csv
+import time
+import threading
+
+import streamlit as st
+from geopy.geocoders import Nominatim
+from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+
+from state_db import STATE_DIR, connect, init
+from profiles import normalize
+
+CACHE_PATH = os.path.join(STATE_DIR, "geocode.sqlite3")
+CACHE_TTL = 30 * 24 * 60 * 60
+MISS_TTL = 24 * 60 * 60  # "not found" answers are kept for less time
+USER_AGENT = "streamlit_app"
+TIMEOUT = 10
+RATE = 1.0  # Nominatim usage policy: at most one request per second
+RATE_WAIT = 15  # longest a participant waits for a request slot
+# Optional offline gazetteer: CSV with name,country,lat,lng (e.g. a GeoNames cities extract)
+GAZETTEER_PATH = os.environ.get("GEOCODER_GAZETTEER")
+CACHE_VERSION = 1  # bump to drop every cached answer (see GeocodeCache)
+NOT_FOUND = "Location not found"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS geocode (
+    query TEXT PRIMARY KEY,
+    found INTEGER NOT NULL,
+    lat REAL,
+    lng REAL,
+    name TEXT,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def normalize_query(location_text, country):
+    return re.sub(r"[\s,]+", " ", f"{location_text}, {country}".lower()).strip()
+
+
+def _result(lat=None, lng=None, name=None, error=None):
+    if error is None:
+        return {"lat": lat, "lng": lng, "name": name, "success": True}
+    return {"lat": None, "lng": None, "name": None, "success": False, "error": error}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `capacity` banked
+    """
+
+    def __init__(self, rate=RATE, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """
+        Take a token, sleeping until one is available. Returns False if that
+        would take longer than `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class NominatimBackend:
+    """
+    The public Nominatim service; one client shared by every caller
+    """
+
+    remote = True
+
+    def __init__(self, user_agent=USER_AGENT, timeout=TIMEOUT):
+        self.client = Nominatim(user_agent=user_agent, timeout=timeout)
+
+    def geocode(self, location_text, country):
+        location = self.client.geocode(f"{location_text}, {country}")
+        if location is None:
+            return None
+        return location.latitude, location.longitude, location.address
+
+
+class GazetteerBackend:
+    """
+    Offline lookup of place names by exact (normalized) name. Built from
+    `(name, country, lat, lng)` rows of a real gazetteer such as a GeoNames
+    extract; the first row wins for repeated names, so list larger places
+    first. (The profiles' `cities` are map markers with approximate,
+    sometimes shared coordinates, and must not be used here.)
+    """
+
+    remote = False
+
+    def __init__(self, places):
+        self.places = {}
+        for name, country, lat, lng in places:
+            self.places.setdefault((normalize(name), normalize(country)), (float(lat), float(lng), f"{name}, {country}"))
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls((row["name"], row["country"], row["lat"], row["lng"]) for row in csv.DictReader(f))
+
+    def geocode(self, location_text, country):
+        # Accept "Ljubljana" as well as "Ljubljana, Slovenia"
+        name = location_text.split(",")[0]
+        return self.places.get((normalize(name), normalize(country)))
+
+
+class GeocodeCache:
+    """
+    Persistent normalized query -> result cache with expiry
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, miss_ttl=MISS_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        init(path, SCHEMA)
+        with self._connect() as conn:
+            # Answers cached by an older version may be wrong (e.g. profile marker coordinates)
+            if conn.execute("PRAGMA user_version").fetchone()[0] < CACHE_VERSION:
+                conn.execute("DELETE FROM geocode")
+                conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+
+    def _connect(self):
+        return connect(self.path)
+
+    def get(self, query):
+        """
+        (found, lat, lng, name) for a live entry, else None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT found, lat, lng, name FROM geocode WHERE query = ? AND expires_at > ?", (query, time.time())
+            ).fetchone()
+        return row
+
+    def put(self, query, hit):
+        found = hit is not None
+        lat, lng, name = hit if found else (None, None, None)
+        expires_at = time.time() + (self.ttl if found else self.miss_ttl)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (query, found, lat, lng, name, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (query, int(found), lat, lng, name, expires_at)
+            )
+
+
+class Geocoder:
+    """
+    Resolves free-text locations through `backends` in order (offline ones
+    first), caching every answer and throttling remote backends with `limiter`
+    """
+
+    def __init__(self, backends, cache=None, limiter=None, rate_wait=RATE_WAIT):
+        self.backends = backends
+        self.cache = cache
+        self.limiter = limiter or TokenBucket()
+        self.rate_wait = rate_wait
+
+    def geocode(self, location_text, country):
+        """
+        {"lat", "lng", "name", "success"} (+ "error" when it failed)
+        """
+        query = normalize_query(location_text, country)
+        cached = self.cache.get(query) if self.cache else None
+        if cached is not None:
+            found, lat, lng, name = cached
+            return _result(lat, lng, name) if found else _result(error=NOT_FOUND)
+
+        try:
+            hit = None
+            asked_remote = False
+            for backend in self.backends:
+                if backend.remote:
+                    if not self.limiter.acquire(timeout=self.rate_wait):
+                        return _result(error="Geocoding service is busy. Please try again.")
+                    asked_remote = True
+                hit = backend.geocode(location_text, country)
+                if hit is not None:
+                    break
+        except GeocoderTimedOut:
+            return _result(error="Geocoding service timed out. Please try again.")
+        except GeocoderUnavailable:
+            return _result(error="Geocoding service unavailable. Please try again later.")
+        except Exception as e:
+            return _result(error=f"Error: {str(e)}")
+
+        # An offline-only miss says nothing about the place, so it is not cached
+        if self.cache and (hit or asked_remote):
+            self.cache.put(query, hit)
+        return _result(*hit) if hit else _result(error=NOT_FOUND)
+
+
+def build_geocoder(offline=None, gazetteer=GAZETTEER_PATH, rate_wait=RATE_WAIT):
+    """
+    The `gazetteer` CSV first if there is one, then Nominatim unless `offline`
+    (default: GEOCODER=offline in the environment, for tests and runs without network).
+    `rate_wait` caps how long a lookup waits for a Nominatim slot; None waits
+    as long as it takes (batch jobs, where nobody is waiting on the page).
+    """
+    if offline is None:
+        offline = os.environ.get("GEOCODER", "nominatim") == "offline"
+    backends = []
+    if gazetteer:
+        backends.append(GazetteerBackend.from_csv(gazetteer))
+    if not offline:
+        backends.append(NominatimBackend())
+    return Geocoder(backends, GeocodeCache(), rate_wait=rate_wait)
+
+
+@st.cache_resource(show_spinner=False)
+def get_geocoder():
+    return build_geocoder()
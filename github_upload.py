@@ -0,0 +1,70 @@
+import requests
+
+from http_client import MAX_RETRIES, get_http
+from upload_spool import Base64Stream
+
+API = "https://api.github.com"
+
+
+class GitBatchUploader:
+    """
+    Commits a batch of files to a branch as ONE commit through the Git data
+    API: blobs are created concurrently (see upload_queue.UploadQueue), then
+    a single tree, a single commit and a single ref update. Compared with one
+    contents-API PUT per file this costs one commit's worth of latency
+    instead of N.
+
+    Requests go through the process-wide http_client, which pools the
+    connections and retries transient and rate-limit failures.
+    """
+
+    def __init__(self, owner, repo, token, branch="main", retries=MAX_RETRIES, http=None):
+        self.base = f"{API}/repos/{owner}/{repo}"
+        self.owner = owner
+        self.repo = repo
+        self.branch = branch
+        self.retries = retries
+        self.http = http or get_http()
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+
+    def _request(self, method, path, headers=None, **kwargs):
+        response = self.http.request(method, self.base + path, headers=dict(self.headers, **(headers or {})), **kwargs)
+        return response.json()
+
+    def create_blob(self, source):
+        """
+        Upload the raw file at `source` as a blob and return its sha. The file
+        is base64-encoded while it is streamed, never held in memory.
+        """
+        body = Base64Stream(source, prefix=b'{"encoding": "base64", "content": "', suffix=b'"}')
+        blob = self._request("POST", "/git/blobs", data=body, headers={"Content-Type": "application/json"})
+        return blob["sha"]
+
+    def push(self, path, source):
+        # UploadQueue interface: the blob only becomes visible at `path` on commit()
+        return self.create_blob(source)
+
+    def commit(self, blobs, message):
+        """
+        Point `branch` at a new commit adding `blobs` ({path: blob sha}).
+        Retries from the new head if someone else moved the branch meanwhile.
+        """
+        entries = [{"path": path, "mode": "100644", "type": "blob", "sha": sha} for path, sha in blobs.items()]
+        for attempt in range(self.retries + 1):
+            head = self._request("GET", f"/git/ref/heads/{self.branch}")["object"]["sha"]
+            base_tree = self._request("GET", f"/git/commits/{head}")["tree"]["sha"]
+            tree = self._request("POST", "/git/trees", json={"base_tree": base_tree, "tree": entries})
+            commit = self._request("POST", "/git/commits", json={"message": message, "tree": tree["sha"], "parents": [head]})
+            try:
+                self._request("PATCH", f"/git/refs/heads/{self.branch}", json={"sha": commit["sha"], "force": False})
+                return commit["sha"]
+            except requests.HTTPError as e:
+                # 422: not a fast-forward, the branch moved under us
+                if e.response.status_code != 422 or attempt == self.retries:
+                    raise
+
+    def url(self, path):
+        return f"https://github.com/{self.owner}/{self.repo}/blob/{self.branch}/{path}"
@@ -0,0 +1,102 @@
+import time
+import random
+import threading
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = 32  # connections kept alive per host; enough for a 30-image burst
+TIMEOUT = (5, 30)  # (connect, read) seconds
+MAX_RETRIES = 4
+BACKOFF_MAX = 30
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RATE_LIMIT_WAIT = 60  # longest we sleep for a GitHub rate-limit reset before failing
+
+
+class HttpClient:
+    """
+    One pooled requests.Session shared by every session of the process, so
+    bursts of requests to GitHub reuse warm keep-alive TLS connections.
+    Requests get a default timeout and are retried with jittered exponential
+    backoff on connection errors and 429/5xx, honouring Retry-After and
+    GitHub's X-RateLimit-* headers.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, timeout=TIMEOUT, retries=MAX_RETRIES):
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+        self.rate_limit = {}  # host -> (remaining, reset epoch), from the last response
+        self._lock = threading.Lock()
+
+    def _delay(self, response, attempt):
+        """
+        Seconds to wait before retrying `response`, or None if it should not be retried
+        """
+        backoff = min(2 ** attempt, BACKOFF_MAX) * (0.5 + random.random())
+        if response is None:
+            return backoff
+        headers = response.headers
+        if headers.get("X-RateLimit-Remaining") == "0" and response.status_code in (403, 429):
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            wait = float(headers.get("X-RateLimit-Reset", 0)) - time.time() + 1
+            return max(wait, 0) if wait <= RATE_LIMIT_WAIT else None
+        if response.status_code not in RETRY_STATUS:
+            return None
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(int(retry_after), RATE_LIMIT_WAIT)
+        return backoff
+
+    def request(self, method, url, **kwargs):
+        """
+        Like requests.request; the final response is returned with
+        raise_for_status() already applied
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            # Stream bodies (see upload_spool.Base64Stream) are re-read from the start
+            if hasattr(kwargs.get("data"), "seek"):
+                kwargs["data"].seek(0)
+            with self._lock:
+                self.stats["requests"] += 1
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            if response is not None:
+                self._track(response)
+            delay = self._delay(response, attempt)
+            if response is not None and (delay is None or attempt == self.retries):
+                response.raise_for_status()
+                return response
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(delay)
+
+    def _track(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None:
+            host = requests.utils.urlparse(response.url).netloc
+            with self._lock:
+                self.rate_limit[host] = (int(remaining), int(response.headers.get("X-RateLimit-Reset", 0)))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, rate_limit=dict(self.rate_limit))
+
+
+@st.cache_resource(show_spinner=False)
+def get_http():
+    return HttpClient()
@@ -0,0 +1,110 @@
+import os
+import shutil
+
+import streamlit as st
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+except ImportError:  # optional, only needed for the "s3" backend (pip install boto3)
+    boto3 = None
+
+import clients
+from github_upload import GitBatchUploader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCAL_ROOT = os.path.join(BASE_DIR, "procured")
+MULTIPART_CHUNK = 8 * 1024 * 1024
+
+# Every backend has the UploadQueue interface: push(path, source) stores the
+# spooled file at `source` under the repo-style `path` ("Kenya_images/x.png")
+# and returns a JSON-serializable result; commit(results, message) makes the
+# batch visible (only GitHub needs it); url(path) is what responses record.
+
+
+class LocalStorage:
+    """
+    Images written under a directory on this server (or a mounted volume).
+    Responses record the path relative to the root, not where this server keeps it.
+    """
+
+    def __init__(self, root=LOCAL_ROOT):
+        self.root = root
+
+    def push(self, path, source):
+        target = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+        return path
+
+    def commit(self, results, message):
+        return None
+
+    def url(self, path):
+        return path
+
+
+class S3Storage:
+    """
+    Images in an S3-compatible bucket (AWS, MinIO, R2, ...). Files are
+    streamed from the spool and sent in parallel multipart chunks once they
+    pass MULTIPART_CHUNK, so size and throughput are not capped by an API.
+    """
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None, access_key_id=None, secret_access_key=None):
+        if boto3 is None:
+            raise RuntimeError("The s3 image storage needs boto3 (pip install boto3)")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url
+        # boto3 clients are thread-safe, so UploadQueue workers share this one
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region,
+                                   aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key)
+        self.transfer = TransferConfig(multipart_threshold=MULTIPART_CHUNK, multipart_chunksize=MULTIPART_CHUNK)
+
+    def key(self, path):
+        return f"{self.prefix}/{path}" if self.prefix else path
+
+    def push(self, path, source):
+        self.client.upload_file(source, self.bucket, self.key(path), Config=self.transfer)
+        return self.key(path)
+
+    def commit(self, results, message):
+        return None
+
+    def url(self, path):
+        return f"s3://{self.bucket}/{self.key(path)}"
+
+
+def build_storage(secrets):
+    """
+    The image storage selected by `image_storage` in the app secrets:
+    "github" (default, the study repository), "local" or "s3"
+    """
+    kind = secrets.get("image_storage", "github")
+    if kind == "local":
+        return LocalStorage(secrets.get("image_storage_root", LOCAL_ROOT))
+    if kind == "s3":
+        return S3Storage(
+            secrets["s3_bucket"],
+            prefix=secrets.get("s3_prefix", ""),
+            endpoint_url=secrets.get("s3_endpoint_url"),
+            region=secrets.get("s3_region"),
+            access_key_id=secrets.get("s3_access_key_id"),
+            secret_access_key=secrets.get("s3_secret_access_key"),
+        )
+    if kind == "github":
+        owner, repo_name = secrets["github_repo"].split('/')
+        return GitBatchUploader(owner, repo_name, secrets["github_token"])
+    raise ValueError(f"Unknown image_storage {kind!r}; expected github, local or s3")
+
+
+@st.cache_resource(show_spinner=False)
+def get_storage():
+    """
+    The configured storage, shared by every session of this process (all
+    backends are safe to use from several threads)
+    """
+    return build_storage(clients.get_secrets())
@@ -0,0 +1,146 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import requests
+import streamlit as st
+
+from http_client import get_http
+
+GITHUB = "https://raw.githubusercontent.com/abhipsabasu/Image_geoprofiling/main/"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, ".cache", "images")
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+class ImageStore:
+    """
+    Serves survey images from the checkout first, then from a disk-backed LRU
+    cache of earlier remote fetches, and only then from raw.githubusercontent.
+
+    Cache entries are stored as `<sha1(path)>_<sha256(content)>` so a path
+    that is re-fetched with new content replaces the old entry.
+    """
+
+    def __init__(self, root=BASE_DIR, base_url=GITHUB, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, timeout=10, http=None):
+        self.root = root
+        self.http = http or get_http()
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.stats = {"local_hits": 0, "cache_hits": 0, "misses": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # path key -> (file name, size), oldest first
+        self._size = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if "_" not in name or name.endswith(".tmp"):
+                continue
+            full = os.path.join(self.cache_dir, name)
+            stat = os.stat(full)
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            key = name.split("_", 1)[0]
+            self._entries[key] = (name, size)
+            self._size += size
+
+    @staticmethod
+    def _key(path):
+        return hashlib.sha1(path.encode("utf-8")).hexdigest()
+
+    def local_path(self, path):
+        full = os.path.normpath(os.path.join(self.root, path))
+        # Never serve anything outside the checkout
+        if not full.startswith(self.root + os.sep):
+            return None
+        return full if os.path.isfile(full) else None
+
+    def read(self, path):
+        """
+        Return the bytes of the image at repo-relative `path`
+        """
+        local = self.local_path(path)
+        if local:
+            with open(local, "rb") as f:
+                data = f.read()
+            with self._lock:
+                self.stats["local_hits"] += 1
+            return data
+
+        key = self._key(path)
+        data = self._read_cached(key)
+        if data is not None:
+            return data
+
+        with self._lock:
+            self.stats["misses"] += 1
+        try:
+            response = self.http.get(self.base_url + path, timeout=self.timeout)
+        except requests.RequestException:
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        data = response.content
+        self._write_cached(key, data)
+        return data
+
+    def _read_cached(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        full = os.path.join(self.cache_dir, entry[0])
+        try:
+            with open(full, "rb") as f:
+                data = f.read()
+            os.utime(full)
+        except FileNotFoundError:
+            with self._lock:
+                if self._entries.pop(key, None):
+                    self._size -= entry[1]
+            return None
+        with self._lock:
+            self.stats["cache_hits"] += 1
+        return data
+
+    def _write_cached(self, key, data):
+        name = f"{key}_{hashlib.sha256(data).hexdigest()}"
+        full = os.path.join(self.cache_dir, name)
+        tmp = f"{full}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, full)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._size -= old[1]
+                if old[0] != name:
+                    self._remove(old[0])
+            self._entries[key] = (name, len(data))
+            self._size += len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, (old_name, old_size) = self._entries.popitem(last=False)
+                self._size -= old_size
+                self._remove(old_name)
+
+    def _remove(self, name):
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, cached_files=len(self._entries), cached_bytes=self._size)
+
+
+@st.cache_resource(show_spinner=False)
+def get_image_store():
+    return ImageStore()
@@ -0,0 +1,39 @@
+import os
+
+import streamlit.components.v1 as components
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_DIR = os.path.join(BASE_DIR, "location_picker_frontend")
+MAP_HEIGHT = 460
+
+# Google Maps search box whose selection comes back to Python as the
+# component value, instead of being posted to a parent window nobody listens to.
+# Called with the same key on every rerun, the iframe stays mounted and Maps JS
+# is loaded once per session; changed args are applied to the live map.
+_component = components.declare_component("location_picker", path=FRONTEND_DIR)
+
+
+def location_picker(api_key, country, center, zoom, cities, selection_id=None, picked=None, key="location_picker", height=MAP_HEIGHT):
+    """
+    Render the map and return the last place the participant picked as
+    {"lat", "lng", "name", "address", "picked_at"}, or None before any pick.
+    `picked_at` (ms since epoch) tells a new pick from the same one
+    returned again on a later rerun.
+
+    A new `selection_id` (e.g. the image index) clears the pick and recentres
+    the map; `picked` is the place Python currently holds ({"lat", "lng",
+    "address"}): a place set from Python is marked on the map, and passing
+    None after a pick clears it from the map.
+    """
+    return _component(
+        api_key=api_key,
+        country=country,
+        center=center,
+        zoom=zoom,
+        cities=cities,
+        selection_id=selection_id,
+        picked=picked,
+        key=key,
+        default=None,
+        height=height,
+    )
@@ -0,0 +1,123 @@
+import os
+import glob
+import argparse
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from PIL import Image
+
+import derivatives
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(BASE_DIR, "image_manifest.npy")
+CSV_SUFFIX = "_hs.csv"
+
+
+class Manifest:
+    """
+    Read-only per-image metadata for the images listed in the
+    `<Country>_hs.csv` files (see build()), one row per image; the array is
+    memory-mapped, so loading it is a page-in rather than decoding and
+    hashing images.
+
+    Only fixed facts about the images are kept: the remaining `frequency`
+    counts change with every completed session, so they come from the live
+    CSV export (see allocation.py), never from a build-time snapshot.
+    """
+
+    def __init__(self, records, root=BASE_DIR):
+        self.records = records
+        self.root = root
+        self._rows = {path.decode(): row for row, path in enumerate(records["file_path"])}
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH, root=BASE_DIR):
+        return cls(np.load(path, mmap_mode="r"), root)
+
+    def lookup(self, path):
+        row = self._rows.get(path)
+        return None if row is None else self.records[row]
+
+    def display_path(self, path):
+        """
+        Local display-size variant of `path` if it has been generated, else None
+        """
+        record = self.lookup(path)
+        if record is None or not record["thumbnail"]:
+            return None
+        local = os.path.join(self.root, record["thumbnail"].decode())
+        return local if os.path.exists(local) else None
+
+
+def _image_meta(path, root, size, fmt):
+    try:
+        with open(os.path.join(root, path), "rb") as f:
+            data = f.read()
+    except OSError:
+        return 0, 0, 0, "", ""
+    try:
+        # Only the header is decoded for the dimensions
+        width, height = Image.open(BytesIO(data)).size
+    except Exception:
+        width = height = 0
+    digest = derivatives.source_hash(data)
+    thumbnail = os.path.relpath(derivatives.derivative_path(digest, size, fmt), derivatives.BASE_DIR)
+    return width, height, len(data), digest, thumbnail
+
+
+def build(csv_paths, root=BASE_DIR, size=derivatives.DISPLAY_SIZE, fmt="JPEG"):
+    """
+    Compile the images listed in `csv_paths` into one structured array:
+    file_path, plus width, height, byte size, sha256 and the derived
+    display-variant path of every image found under `root`
+    """
+    rows = {}
+    for csv_path in csv_paths:
+        df = pd.read_csv(csv_path)
+        if "frequency" not in df:
+            # e.g. wikimedia_geo_images_hs.csv, which is not an allocation list
+            continue
+        for path in df["file_path"]:
+            # A few paths are listed more than once
+            if path not in rows:
+                rows[path] = (path,) + _image_meta(path, root, size, fmt)
+    rows = list(rows.values())
+
+    def width(index):
+        return max([len(str(row[index]).encode()) for row in rows] + [1])
+
+    dtype = [
+        ("file_path", f"S{width(0)}"),
+        ("width", "<i4"),
+        ("height", "<i4"),
+        ("size", "<i8"),
+        ("sha256", "S64"),
+        ("thumbnail", f"S{width(5)}"),
+    ]
+    return np.array([tuple(v.encode() if isinstance(v, str) else v for v in row) for row in rows], dtype=dtype)
+
+
+@st.cache_resource(show_spinner=False)
+def get_manifest():
+    """
+    The process-wide manifest, or None if it has not been built
+    """
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    return Manifest.load()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the <Country>_hs.csv files into image_manifest.npy")
+    parser.add_argument("csvs", nargs="*", help=f"CSV files (default: *{CSV_SUFFIX})")
+    parser.add_argument("--out", default=MANIFEST_PATH)
+    parser.add_argument("--size", type=int, default=derivatives.DISPLAY_SIZE)
+    parser.add_argument("--format", choices=sorted(derivatives.FORMATS), default="JPEG")
+    args = parser.parse_args()
+    csvs = args.csvs or sorted(glob.glob(os.path.join(BASE_DIR, f"*{CSV_SUFFIX}")))
+    records = build(csvs, size=args.size, fmt=args.format)
+    np.save(args.out, records)
+    found = np.count_nonzero(records["size"])
+    print(f"{len(records)} rows, {found} with local images, {records.nbytes / 1e3:.0f} kB -> {args.out}")
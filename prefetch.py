@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_DEPTH = 3
+PREFETCH_WORKERS = 2
+
+
+class ImagePrefetcher:
+    """
+    Per-session look-ahead loader. While image k is on screen, images
+    k+1..k+depth are fetched and decoded in the background so the next page
+    renders from memory. Only the current image and the look-ahead window
+    are kept; everything behind the current index is dropped.
+    """
+
+    def __init__(self, paths, load, depth=PREFETCH_DEPTH, workers=PREFETCH_WORKERS):
+        self.paths = list(paths)
+        self.load = load
+        self.depth = depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._futures = OrderedDict()  # index -> Future
+        self._lock = threading.Lock()
+
+    def _submit(self, index):
+        future = self._futures.get(index)
+        if future is None or (future.done() and future.exception() is not None):
+            future = self._executor.submit(self.load, self.paths[index])
+            self._futures[index] = future
+        return future
+
+    def schedule(self, index):
+        """
+        Start loading `index` and the next `depth` images, dropping older ones
+        """
+        with self._lock:
+            for old in [i for i in self._futures if i < index]:
+                self._futures.pop(old).cancel()
+            for i in range(index, min(index + self.depth + 1, len(self.paths))):
+                self._submit(i)
+
+    def get(self, index, timeout=None):
+        """
+        Return the loaded image at `index`, blocking only if it is not ready yet
+        """
+        self.schedule(index)
+        with self._lock:
+            future = self._futures[index]
+        return future.result(timeout=timeout)
+
+    def close(self):
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown(wait=False)
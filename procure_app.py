@@ -0,0 +1,551 @@
+import streamlit as st
+import pandas as pd
+from PIL import Image
+from io import BytesIO
+import clients
+import derivatives
+from image_storage import get_storage
+from upload_spool import get_spool
+from upload_queue import UploadQueue
+from profiles import get_profile, load_profiles
+from response_sink import ResponseSink
+from write_behind import get_write_behind
+from session_store import get_session_store
+from location_picker import location_picker
+import exif
+
+# One app serves every procurement study; the country comes from the URL
+# (?country=Slovakia) or from the thin streamlit_procure*.py entry points.
+# Clients and caches are shared by all countries served by this process.
+
+
+YEAR_OPTIONS = [str(i) for i in range(2025, 1999, -1)]
+# What a refreshed page needs to carry on (see session_store.py); uploads are
+# kept as spool handles, so no photo has to be uploaded again
+CHECKPOINT_KEYS = ("index", "responses", "temp_images", "birth_country", "residence", "privacy")
+
+
+def set_location(location_text, location):
+    st.session_state.location_text = location_text
+    st.session_state.location = location
+
+
+def reset_selections():
+    # Clear all form selections for the next image using a more robust method
+
+    # Method 1: Try to clear specific keys
+    keys_to_clear = ["q1", "q2", "q3", "q5", "q6_month", "q6_year", "location_text"]
+    for key in keys_to_clear:
+        if key in st.session_state:
+            del st.session_state[key]
+
+    # Method 2: Reset question index
+    st.session_state.q1_index = 0
+
+    # Method 3: Force rerun to clear form state
+    # This is more reliable than trying to clear individual keys
+
+def save_checkpoint(country):
+    state = {key: st.session_state[key] for key in CHECKPOINT_KEYS}
+    # Blobs already pushed are not pushed again, buffered answers are written again
+    state["blobs"] = st.session_state.upload_queue.done()
+    state["unflushed"] = st.session_state.response_sink.pending()
+    if "upload_failures" in st.session_state:
+        state["upload_failures"] = {path: str(e) for path, e in st.session_state.upload_failures.items()}
+    get_session_store().save(f"procure:{country}", st.session_state.prolific_id, state)
+
+
+def resume(saved):
+    """
+    Continue a checkpointed session: restore its answers and requeue its
+    spooled images, reusing the blobs it had already pushed
+    """
+    for key in CHECKPOINT_KEYS:
+        st.session_state[key] = saved[key]
+    for image_data in st.session_state.temp_images:
+        st.session_state.upload_queue.submit(image_data['file_path'], get_spool().path(image_data['spool']),
+                                             result=saved["blobs"].get(image_data['file_path']))
+    if "upload_failures" in saved:
+        st.session_state.upload_failures = saved["upload_failures"]
+    st.session_state.unflushed = saved["unflushed"]
+
+
+def process_upload(uploaded_file):
+    """
+    Hash, spool and downscale an uploaded photo once. Every later rerun
+    while it sits in the uploader reuses the session's entry for its hash:
+    {"digest", "size", "width", "height", "format", "exif", "spool", "display"}
+    ("display" and "spool" are None if the file cannot be read).
+
+    The photo's EXIF date pre-fills the month/year answers. Its GPS position
+    is offered in the location section. GPS and identifying tags are
+    stripped before the bytes are spooled for upload; a photo they cannot be
+    stripped from is rejected like an unreadable one.
+    """
+    digest = st.session_state.upload_digests.get(uploaded_file.file_id)
+    if digest in st.session_state.uploads:
+        return st.session_state.uploads[digest]
+
+    data = uploaded_file.getvalue()
+    digest = derivatives.source_hash(data)
+    st.session_state.upload_digests[uploaded_file.file_id] = digest
+    if digest not in st.session_state.uploads:
+        entry = {"digest": digest, "size": len(data), "width": None, "height": None, "format": None, "display": None,
+                 "spool": None, "exif": exif.read_exif(data)}
+        try:
+            image = Image.open(BytesIO(data))
+            entry["width"], entry["height"] = image.size
+            entry["format"] = image.format
+            # Phone photos can be 12 MP; only a display-sized copy is sent to the browser
+            entry["display"] = derivatives.render(data)
+            stored = exif.strip_metadata(data)
+        except Exception as e:
+            print(f"Could not read upload {digest}: {e}")
+            entry["display"] = None
+        else:
+            # The cleaned bytes go to the disk spool now, so submitting does not touch them again
+            entry["spool"] = get_spool().put(stored, digest=digest if stored == data else None)
+        st.session_state.uploads[digest] = entry
+
+        # Pre-fill the date questions unless the participant already answered them. The
+        # selectboxes exist before the photo is uploaded, so unanswered ones are already in
+        # the session state with the placeholder
+        if entry["display"] is not None:
+            month, year = exif.taken_month_year(entry["exif"])
+            month_key, year_key = f"q6_month_{st.session_state.index}", f"q6_year_{st.session_state.index}"
+            if month and st.session_state.get(month_key, "Choose an option") == "Choose an option":
+                st.session_state[month_key] = month
+            if year in YEAR_OPTIONS and st.session_state.get(year_key, "Choose an option") == "Choose an option":
+                st.session_state[year_key] = year
+    return st.session_state.uploads[digest]
+
+def instructions(profile):
+    return f"""
+We are collecting a dataset of images from **{profile['country']}** to assess the knowledge of modern-day AI technologies about surroundings within the country. With your consent, we request you to upload photos that you have taken but have **not shared online**.
+
+Following are the instructions for the same.
+
+**What kind of images to upload**:
+
+- Photos should depict a variety of surroundings within {profile['country']}. Try to avoid sharing images of well-known, highly-recognizable tourist attractions.
+- Upload a diverse and distinct set of images in terms of content.
+- Ensure the images are clear and well-lit. Dark images with low visibility will hamper our study.
+- Avoid uploading blurry images.
+- Outdoor scenes are preferred.
+- DO NOT upload images with identifiable faces and avoid those with license plates to protect privacy. 
+
+**Image Requirements**:
+
+-   All images must be from **within {profile['country']}**.
+-   Do **not** upload images already posted on social media.
+-   Try to upload images that represent diverse locations or settings.
+
+**What to do:**
+1.  **Upload {profile['num_collect']} images (all compulsory)**, one at a time.
+2.  For each image:
+    -   **Select the location** where the photo was taken using the search box or map.
+    -   **Rate** how clearly the photo suggests it was taken in {profile['country']}, and **list the clues** that helped you make that judgment.
+    -   **Rate the photo** on the popularity of the location captured.
+    -   **Enter the month and year** when the photo was taken.
+    -   **Click** "Submit and Next" to move to the next image.
+3. If the screen freezes, do **NOT** refresh the page. Instead, wait for a few seconds for the internet connectivity to stabilize.
+4. After uploading the photos, you can submit the COMPLETION CODE displayed on the screen to Prolific and end the task formally.
+
+
+You have *{profile['time_limit']}* minutes to upload the photos and answer the questions surrounding them. After you upload each photo, wait for the photo to be visible on screen, then answer the questions.
+"""
+
+
+# ---- PER-IMAGE FRAGMENTS ----
+# Picking a place or answering a question reruns only its fragment; the rest of
+# the page (instructions, upload preview, progress) is rebuilt once per image.
+@st.fragment
+def location_section(profile, google_maps_api_key, upload):
+    country = profile["country"]
+    st.markdown(f"**Where in {country} was the photo taken? Use the search box within map below to select the location where the photo was taken:** <span style='color: red;'>*</span>", unsafe_allow_html=True)
+
+    # Filled in once the map's pick has been processed below
+    location_banner = st.empty()
+
+    # Offer the GPS position recorded in the photo (in a container that is always
+    # there, so the map below keeps its place in the page)
+    with st.container():
+        photo = upload["exif"] if upload else None
+        if photo and photo["lat"] is not None:
+            photo_location = {"lat": photo["lat"], "lng": photo["lng"]}
+            if st.session_state.location != photo_location:
+                st.info(f"📍 This photo carries a GPS position ({photo['lat']:.5f}, {photo['lng']:.5f}).")
+                # A callback runs before the fragment, so this run already shows the new location
+                st.button(
+                    "Use the photo's location",
+                    key=f"use_photo_location_{st.session_state.index}",
+                    on_click=set_location,
+                    args=(f"{photo['lat']:.5f}, {photo['lng']:.5f}", photo_location),
+                )
+
+    # Create a Google Map with search functionality
+    st.markdown("**🗺️ Location Map:**")
+
+    if google_maps_api_key:
+        # The picked place comes back as the component value, with its coordinates
+        selection = location_picker(
+            google_maps_api_key,
+            country,
+            profile["center"],
+            profile["zoom"],
+            profile["cities"],
+            selection_id=st.session_state.index,
+            picked=st.session_state.location and dict(st.session_state.location, address=st.session_state.location_text),
+        )
+        # A rerun returns the last pick again; only a new pick replaces the location
+        if selection and selection["picked_at"] != st.session_state.location_picked_at:
+            st.session_state.location_picked_at = selection["picked_at"]
+            st.session_state.location_text = selection["address"]
+            st.session_state.location = {"lat": selection["lat"], "lng": selection["lng"]}
+
+        if not st.session_state.location_text:
+            st.info("Search for the location in the map above and pick it from the suggestions. If you are unable to find the location, please select the nearest location from the map.")
+
+    else:
+        # Fallback to Streamlit map if no Google Maps API key
+        st.warning("⚠️ Google Maps API key not configured. Using default map.")
+        # Show a basic map of the country
+        points = [profile["center"]] + profile["cities"][:4]
+        map_data = pd.DataFrame({
+            'latitude': [point["lat"] for point in points],
+            'longitude': [point["lng"] for point in points]
+        })
+        st.map(map_data)
+        manual_location = st.text_input(
+            "Enter the location where the photo was taken:",
+            placeholder="e.g., " + ", ".join(city["name"] for city in profile["cities"][:5]),
+            key=f"manual_location_{st.session_state.index}"
+        )
+        if manual_location:
+            st.session_state.location_text = manual_location
+            st.session_state.location = None
+
+    # Warning that coordinates are required
+    if not hasattr(st.session_state, 'location_text') or not st.session_state.location_text:
+        location_banner.error("🚨 **Search for the location where the photo was taken in the map text box below**")
+    else:
+        location_banner.success("✅ **Location selected successfully!**")
+
+    # Show location status
+    if not hasattr(st.session_state, 'location_text') or not st.session_state.location_text:
+        st.error("❌ **No location selected.** Please select a location above to proceed.")
+    else:
+        st.markdown(f"**📍 Selected Location:** {st.session_state.location_text}")
+
+    # Show current location if set
+    if hasattr(st.session_state, 'location_text') and st.session_state.location_text:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.write(f"**Current Selected Location:** {st.session_state.location_text}")
+        with col2:
+            st.button("🗑️ Clear Location", type="secondary", on_click=set_location, args=(None, None))
+
+
+@st.fragment
+def questions_section(profile, upload):
+    country = profile["country"]
+    # st.markdown(f"To what extent does this image contain visual cues (e.g., local architecture, language, or scenery) that identify it as being from {country}?")
+    clue_text = None
+    st.markdown(f"""
+    <div style='margin-bottom: 0px; padding-bottom: 0px;'>
+        <strong>To what extent does this image contain visual cues (e.g., local architecture, language, or scenery) that identify it as being from {country}?</strong> 
+        <span style='color: red;'>*</span>
+    </div>
+    """, unsafe_allow_html=True)
+    rating = st.selectbox(
+        f"",
+        options=["Choose an option", 0, 1, 2, 3],
+        format_func=lambda x: f"{'Strong evidence specific to the country' if x==3 else f'Clear cues, but not typically associated with {country}' if x==2 else f'Some visual indications, but not sure if they are specific to {country}' if x==1 else f'No visual indicators visible in the photo' if x==0 else 'Choose an option'}",
+        index=st.session_state.q1_index,
+        key=f'q2_{st.session_state.index}',
+        # unsafe_allow_html=True
+    )
+    if rating in [2, 3]:
+        clue_text = st.text_area("What visual clues or indicators helped you make this judgment?", height=100, key=f'q3_{st.session_state.index}')
+    st.markdown(f"""
+    <div style='margin-bottom: 0px; padding-bottom: 0px;'>
+        <strong>How would you rate the popularity of the location depicted in the photo you uploaded?</strong> 
+        <span style='color: red;'>*</span>
+    </div>
+    """, unsafe_allow_html=True)
+    popularity = st.selectbox(
+        "",
+        options=["Choose an option", 1, 2, 3],
+        format_func=lambda x: f"{'1 - Not Popular' if x==1 else f'2 - Locally Popular' if x==2 else f'3 - Country-wide Popular' if x==3 else 'Choose an option'}",
+        index=st.session_state.q1_index,
+        key=f'q5_{st.session_state.index}',
+        # unsafe_allow_html=True
+    )
+
+    # Month and Year questions
+    st.markdown("""
+    <div style='margin-bottom: 0px; padding-bottom: 0px;'>
+        <strong>📅 When was this photo taken?</strong> 
+        <span style='color: red;'>*</span>
+    </div>
+    """, unsafe_allow_html=True)
+    month_col, year_col = st.columns(2)
+
+    with month_col:
+        month = st.selectbox(
+            "**Month:**",
+            options=["Choose an option", "January", "February", "March", "April", "May", "June", 
+                    "July", "August", "September", "October", "November", "December", "Cannot recall"],
+            key=f'q6_month_{st.session_state.index}'
+        )
+
+    with year_col:
+        year = st.selectbox(
+            "**Year:**",
+            options=["Choose an option"] + YEAR_OPTIONS + ["Cannot recall"],
+            key=f'q6_year_{st.session_state.index}'
+        )
+
+    if st.button("Submit and Next"):
+        if not upload or upload["display"] is None or ((rating == 'Choose an option') or (rating in [2, 3] and clue_text in [None, ''])) or month == "Choose an option" or year == "Choose an option":
+            st.error('Please answer all the questions and upload a file.')
+        elif not hasattr(st.session_state, 'location_text') or not st.session_state.location_text:
+            st.error('Please select a location on the map first and capture the location description.')
+        else:
+            # Spool the raw bytes to disk; session state only keeps the handle
+            image_data = {
+                "file_name": f"{st.session_state.prolific_id}_{st.session_state.index}.png",
+                "file_path": f"{profile['images_dir']}/{f'{st.session_state.prolific_id}_{st.session_state.index}.png'}",
+                "spool": upload["spool"],
+                "index": st.session_state.index
+            }
+
+            # Add to temporary storage and start pushing the blob right away
+            st.session_state.temp_images.append(image_data)
+            st.session_state.upload_queue.submit(image_data['file_path'], get_spool().path(image_data['spool']))
+
+            # Store response data (without uploading image yet)
+            response = {
+                "name": st.session_state.prolific_id,
+                "birth_country": st.session_state.birth_country,
+                "residence": st.session_state.residence,
+                "privacy": st.session_state.privacy,
+                "image_url": image_data["file_path"],  # Will be updated after upload
+                "rating": rating,
+                "location_text": st.session_state.location_text,
+                # Coordinates of the place picked on the map (None for typed locations)
+                "lat": (st.session_state.location or {}).get("lat"),
+                "lng": (st.session_state.location or {}).get("lng"),
+                "popularity": popularity,
+                "clues": clue_text,
+                "month": month,
+                "year": year,
+            }
+            st.session_state.responses.append(response)
+            st.session_state.response_sink.add(st.session_state.index, response)
+
+            st.success("✅ Image and responses saved!")
+            st.toast("Saved successfully!", icon="✅")
+            # Clear location and reset index
+            st.session_state.location_text = None
+            st.session_state.location = None
+            st.session_state.uploads = {}
+            st.session_state.index += 1
+            st.session_state.q1_index = 0
+            save_checkpoint(profile['country'])
+
+            # Force rerun to get fresh forms with new keys
+            st.rerun()
+
+
+def main(default_country=None):
+    # ---- PROFILE ----
+    # A session keeps the country it started with, even if the URL changes
+    if "country" not in st.session_state:
+        st.session_state.country = st.query_params.get("country", default_country)
+    profile = get_profile("procure", st.session_state.country or "")
+    if profile is None:
+        available = ", ".join(p["country"] for p in load_profiles("procure").values())
+        st.error(f"Unknown study country. Open this page with ?country=<name>, one of: {available}")
+        st.stop()
+    country = profile["country"]
+    num_collect = profile["num_collect"]
+
+    firebase_secrets = clients.get_secrets()
+
+    # Clients are cached once per server process (see clients.py)
+    db = clients.get_db()
+
+    # ---- SESSION STATE ----
+    if "index" not in st.session_state:
+        st.session_state.index = 0
+        st.session_state.responses = []
+
+    if "prolific_id" not in st.session_state:
+        st.session_state.prolific_id = None
+
+    if 'location_text' not in st.session_state:
+        st.session_state.location_text = None
+        st.session_state.location = None
+        st.session_state.location_picked_at = None
+
+    if 'q1_index' not in st.session_state:
+        st.session_state.q1_index = 0
+
+    # Processed uploads of the current image, keyed by content hash (see process_upload)
+    if 'uploads' not in st.session_state:
+        st.session_state.uploads = {}
+        st.session_state.upload_digests = {}
+
+    if 'temp_images' not in st.session_state:
+        st.session_state.temp_images = []
+
+    # Images start uploading in the background as soon as they are submitted
+    if 'upload_queue' not in st.session_state:
+        # GitHub, local disk or S3-compatible storage, per the app secrets (see image_storage.py)
+        st.session_state.upload_queue = UploadQueue(get_storage())
+
+    # ---- UI ----
+    st.title(f"Image Collection from {country}")
+    # Show instructions only before Prolific ID is submitted
+    if not st.session_state.prolific_id:
+        st.markdown(instructions(profile), unsafe_allow_html=True)
+    else:
+        # Show View Instructions expander after Prolific ID is submitted
+        with st.expander("📋 View Instructions", expanded=False):
+            st.markdown(instructions(profile), unsafe_allow_html=True)
+
+    if not st.session_state.prolific_id:
+        with st.form("prolific_form"):
+            pid = st.text_input("Please enter your Prolific ID to begin:", max_chars=24)
+            birth = st.text_input("Please enter your country of birth", max_chars=24)
+            res = st.text_input("Please enter your country of residence", max_chars=24)
+            privacy = st.radio(
+                "Do you permit us to release your images publically as a dataset, or strictly use them for our research purpose?",
+                options=["You can make them public", "Only use them for your research"],
+            )
+            submitted = st.form_submit_button("Submit")
+            if submitted:
+                if pid.strip() and birth.strip() and res.strip():
+                    st.session_state.prolific_id = pid.strip()
+                    saved = get_session_store().load(f"procure:{country}", st.session_state.prolific_id)
+                    if saved:
+                        resume(saved)
+                        st.success(f"Welcome back! Continuing from image {saved['index'] + 1}.")
+                    else:
+                        st.session_state.birth_country = birth.strip()
+                        st.session_state.residence = res.strip()
+                        st.session_state.privacy = privacy
+                        st.success("Thank you! You may now begin.")
+                    st.rerun()
+                else:
+                    st.error("Please enter a valid Prolific ID, birth country or residence country.")
+    else:
+        # --- MAIN APP LOGIC (This section runs only after Prolific ID is submitted) ---
+        # Answers are stored one document per image as they are submitted
+        if 'response_sink' not in st.session_state:
+            st.session_state.response_sink = ResponseSink(db, "Image_procurement", st.session_state.prolific_id,
+                                                         queue=get_write_behind())
+            st.session_state.response_sink.start({
+                "birth_country": st.session_state.birth_country,
+                "country_of_residence": st.session_state.residence,
+                "privacy": st.session_state.privacy,
+            })
+            for index in st.session_state.pop("unflushed", []):
+                st.session_state.response_sink.add(index, st.session_state.responses[index])
+
+        if st.session_state.index < num_collect:
+            # Show progress
+            st.markdown(f"**📸 Progress: {st.session_state.index}/{num_collect} images completed**")
+            progress_bar = st.progress(st.session_state.index / num_collect)
+            st.markdown("Answer all questions (marked with <span style='color: red;'>*</span>)", unsafe_allow_html=True)
+            st.markdown(f"""
+            <div style='margin-bottom: 5px; padding-bottom: 0px;'>
+                <strong>Upload image {st.session_state.index + 1}</strong> 
+                <span style='color: red;'>*</span>
+            </div>
+            """, unsafe_allow_html=True)
+
+            uploaded_file = st.file_uploader("", type=["jpg", "jpeg", "png"], key=st.session_state.index)
+            upload = None
+            # The preview lives in a container that is always there, so the map
+            # below keeps its place in the page and is not remounted
+            with st.container():
+                if uploaded_file:
+                    upload = process_upload(uploaded_file)
+                    if upload["size"] < 100:
+                        st.error("⚠️ File seems too small. Possible read error.")
+                    if upload["display"] is not None:
+                        st.image(upload["display"], use_container_width=True)
+                    else:
+                        st.error("Could not read this image. Please upload a JPG or PNG photo.")
+
+
+            # Get Google Maps API key from firebase_secrets
+            location_section(profile, firebase_secrets.get("GOOGLE_MAPS_API_KEY", ""), upload)
+            questions_section(profile, upload)
+        else:
+            # Wait for the background uploads, then commit them all at once
+            st.markdown("**📤 Uploading all images...**")
+
+            upload_progress = st.progress(0)
+            upload_status = st.empty()
+
+            # Reruns of this page must not upload the batch a second time
+            if "upload_failures" not in st.session_state:
+                def show_progress(done, total):
+                    upload_progress.progress(done / total)
+                    upload_status.text(f"Uploading image {done} of {total}...")
+
+                upload_queue = st.session_state.upload_queue
+                blobs, failures = upload_queue.wait(progress=show_progress)
+                try:
+                    if blobs:
+                        upload_queue.uploader.commit(blobs, f"Upload {len(blobs)} images from {st.session_state.prolific_id}")
+                    st.session_state.upload_failures = failures
+                    upload_queue.close()
+                except Exception as e:
+                    # The commit itself failed, so none of the images landed
+                    failures = {image_data['file_path']: e for image_data in st.session_state.temp_images}
+            else:
+                failures = st.session_state.upload_failures
+
+            successful_uploads = 0
+            failed_uploads = 0
+
+            for image_data in st.session_state.temp_images:
+                if image_data['file_path'] in failures:
+                    failed_uploads += 1
+                    st.error(f"❌ Error uploading {image_data['file_name']}: {str(failures[image_data['file_path']])}")
+                else:
+                    successful_uploads += 1
+                    # Update the response with where the image was stored
+                    response = st.session_state.responses[image_data['index']]
+                    image_url = st.session_state.upload_queue.uploader.url(image_data['file_path'])
+                    if response['image_url'] != image_url:
+                        response['image_url'] = image_url
+                        st.session_state.response_sink.add(image_data['index'], response)
+
+            # Show final upload results
+            upload_progress.progress(1.0)
+            if failed_uploads == 0:
+                upload_status.success(f"✅ All {successful_uploads} images uploaded successfully!")
+            else:
+                upload_status.warning(f"⚠️ {successful_uploads} images uploaded, {failed_uploads} failed")
+
+            # Write what is still buffered and mark the session complete
+            st.session_state.response_sink.finish(count=len(st.session_state.responses))
+            save_checkpoint(country)
+
+            st.session_state.submitted_all = True
+            st.success("🎉 Survey complete! Thank you!")
+            st.write(f"✅ **Survey Results:**")
+            st.write(f"📸 **Images:** {successful_uploads} uploaded successfully")
+            st.write(f"📊 **Responses:** {len(st.session_state.responses)} recorded")
+            st.write(f"🗺️ **Locations:** All location descriptions captured")
+            st.write(f"📅 **Timestamps:** Month/year data collected")
+            st.write(f"📧 **Note**: If you wish to revoke your consent, please contact us at <a href='mailto:abhipsabasu@iisc.ac.in'>abhipsabasu@iisc.ac.in</a>.")
+            st.markdown(f"# **ATTENTION: PLEASE PASTE COMPLETION CODE '{profile['completion_code']}' at the end of the study to the Prolific platform!**", unsafe_allow_html=True)
+
+if __name__ == "__main__":
+    main()
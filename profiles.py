@@ -0,0 +1,33 @@
+import os
+import glob
+import json
+
+import streamlit as st
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+
+
+def normalize(name):
+    return "".join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+@st.cache_resource(show_spinner=False)
+def load_profiles(kind):
+    """
+    All `profiles/<kind>/*.json` country profiles, keyed by normalized country name
+    """
+    profiles = {}
+    for path in sorted(glob.glob(os.path.join(PROFILE_DIR, kind, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+        profiles[normalize(profile["country"])] = profile
+    return profiles
+
+
+def get_profile(kind, country):
+    """
+    Profile for `country` ("South Korea", "south_korea" and "SouthKorea" all
+    match), or None if there is no such profile
+    """
+    return load_profiles(kind).get(normalize(country))
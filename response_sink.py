@@ -0,0 +1,144 @@
+import threading
+
+from firebase_admin import firestore
+
+import clients
+
+# Journaling an answer is a local SQLite insert, so each one is written as it
+# arrives: a participant who leaves mid-study loses nothing already submitted
+FLUSH_EVERY = 1  # answers
+SUBCOLLECTION = "responses"
+WRITE_JOB = "response_sink:apply_writes"
+# JSON stand-in for firestore.SERVER_TIMESTAMP in journaled writes
+SERVER_TIMESTAMP = {"$sentinel": "server_timestamp"}
+
+
+class ResponseSink:
+    """
+    Per-session writer of survey answers. Each answer is stored as its own
+    document, `<collection>/<prolific_id>/responses/<index>`, so a dropped
+    session keeps everything flushed so far and a repeated submit of the same
+    image overwrites instead of duplicating. Answers are written in one
+    WriteBatch every `every` answers (by default each answer on submit).
+
+    With a write-behind `queue` the writes are journaled and committed by its
+    workers, so the script thread never waits on Firestore; without one they
+    are committed in place.
+    """
+
+    def __init__(self, db, collection, prolific_id, every=FLUSH_EVERY, queue=None):
+        self.db = db
+        self.queue = queue
+        self.collection = collection
+        self.prolific_id = prolific_id
+        self.every = every
+        self._pending = {}  # index -> response
+        self._lock = threading.Lock()
+
+    @property
+    def session_ref(self):
+        return self.db.collection(self.collection).document(self.prolific_id)
+
+    def response_ref(self, index):
+        return response_ref(self.session_ref, index)
+
+    def _write(self, writes):
+        if self.queue is None:
+            apply_writes({"writes": writes}, db=self.db)
+        else:
+            # Keyed by session so its writes land in order (start before finish)
+            self.queue.submit(WRITE_JOB, {"writes": writes}, key=self.session_ref.path)
+
+    def start(self, fields):
+        """
+        Create / refresh the session document with the participant's details
+        """
+        self._write([_set(self.session_ref, dict(fields, prolific_id=self.prolific_id, completed=False,
+                                                 timestamp=SERVER_TIMESTAMP), merge=True)])
+
+    def add(self, index, response):
+        """
+        Queue (or replace) the answer for image `index`; flushes when due.
+        A failed flush keeps the answers queued for the next one.
+        """
+        with self._lock:
+            self._pending[index] = response
+            due = len(self._pending) >= self.every
+        if due:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Response flush failed, will retry: {e}")
+
+    def pending(self):
+        """
+        Indices of the answers buffered but not yet written
+        """
+        with self._lock:
+            return sorted(self._pending)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        writes = [_set(self.response_ref(index), dict(response, index=index, timestamp=SERVER_TIMESTAMP))
+                  for index, response in pending.items()]
+        try:
+            self._write(writes)
+        except Exception:
+            with self._lock:
+                # Answers queued meanwhile are newer than the failed ones
+                self._pending = {**pending, **self._pending}
+            raise
+        return len(pending)
+
+    def finish(self, fields=None, count=None):
+        """
+        Flush everything and mark the session document completed
+        """
+        self.flush()
+        summary = dict(fields or {}, completed=True, timestamp=SERVER_TIMESTAMP)
+        if count is not None:
+            summary["num_responses"] = count
+        self._write([_set(self.session_ref, summary, merge=True)])
+
+
+def _set(ref, data, merge=False):
+    return {"path": ref.path, "data": data, "merge": merge}
+
+
+def apply_writes(payload, db=None):
+    """
+    Commit journaled document sets, {"writes": [{"path", "data", "merge"}]},
+    in one WriteBatch. Also the write-behind handler for WRITE_JOB.
+    """
+    db = db or clients.get_db()
+    batch = db.batch()
+    for write in payload["writes"]:
+        data = {field: firestore.SERVER_TIMESTAMP if value == SERVER_TIMESTAMP else value
+                for field, value in write["data"].items()}
+        batch.set(db.document(write["path"]), data, merge=write["merge"])
+    try:
+        batch.commit()
+    except Exception as e:
+        # The write-behind retry then runs on a fresh client
+        clients.refresh_on_error(e)
+        raise
+
+
+def response_ref(session_ref, index):
+    # Zero-padded so the documents list in answer order
+    return session_ref.collection(SUBCOLLECTION).document(f"{index:04d}")
+
+
+def read_responses(snapshot):
+    """
+    A session document's answers in order: its `responses` subcollection,
+    or the `responses` array of documents written before answers were
+    stored one by one
+    """
+    answers = [doc.to_dict() for doc in snapshot.reference.collection(SUBCOLLECTION).order_by("index").stream()]
+    if answers:
+        return answers
+    return (snapshot.to_dict() or {}).get("responses") or []
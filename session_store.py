@@ -0,0 +1,70 @@
+import os
+import json
+import time
+
+import streamlit as st
+
+from state_db import STATE_DIR, connect, init
+from upload_spool import SPOOL_MAX_AGE
+
+SESSIONS_PATH = os.path.join(STATE_DIR, "sessions.sqlite3")
+# Checkpoints point at spooled uploads, so they are kept as long as the spool keeps those
+SESSION_MAX_AGE = SPOOL_MAX_AGE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    study TEXT NOT NULL,
+    prolific_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (study, prolific_id)
+);
+"""
+
+
+class SessionStore:
+    """
+    Server-side checkpoints of participants' progress, keyed by study
+    (e.g. "survey:Kenya") and Prolific ID, so a refreshed page resumes
+    where it left off instead of starting the study again
+    """
+
+    def __init__(self, path=SESSIONS_PATH, max_age=SESSION_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        init(path, SCHEMA)
+        self.prune()
+
+    def _connect(self):
+        return connect(self.path)
+
+    def load(self, study, prolific_id, max_age=None):
+        """
+        The last checkpointed state (a dict), or None. `max_age` shortens the
+        store's lifetime for studies whose checkpoints depend on something
+        that expires sooner (e.g. survey image leases).
+        """
+        max_age = self.max_age if max_age is None else min(max_age, self.max_age)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT state FROM sessions WHERE study = ? AND prolific_id = ? AND updated_at > ?",
+                (study, prolific_id, time.time() - max_age)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, study, prolific_id, state):
+        # `state` must be JSON-serializable
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (study, prolific_id, state, updated_at) VALUES (?, ?, ?, ?)",
+                (study, prolific_id, json.dumps(state), time.time())
+            )
+
+    def prune(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.max_age,))
+
+
+@st.cache_resource(show_spinner=False)
+def get_session_store():
+    return SessionStore()
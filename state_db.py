@@ -0,0 +1,43 @@
+import os
+import sqlite3
+
+# Process-local SQLite databases (allocation, journals, caches) live here
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(BASE_DIR, "state")
+
+
+class Transaction:
+    """
+    `with` wrapper that commits/rolls back an explicit BEGIN and closes the connection
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+
+
+def connect(path):
+    """
+    Autocommit connection to `path`, closed when the `with` block ends;
+    writers that read first should start with BEGIN IMMEDIATE
+    """
+    return Transaction(sqlite3.connect(path, timeout=30, isolation_level=None))
+
+
+def init(path, schema):
+    """
+    Create the database at `path` (WAL mode, shared by every thread and process) with `schema`
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with connect(path) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(schema)
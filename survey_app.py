@@ -0,0 +1,339 @@
+import streamlit as st
+import random
+import threading
+import pandas as pd
+from io import StringIO
+from http_client import get_http
+import clients
+from image_store import get_image_store
+from prefetch import ImagePrefetcher
+import derivatives
+from allocation import LEASE_TTL, get_allocator, export_to_github
+from manifest import get_manifest
+from response_sink import ResponseSink
+from write_behind import get_write_behind
+from session_store import get_session_store
+from profiles import get_profile, load_profiles
+
+# One app serves every evaluation study; the country comes from the URL
+# (?country=Kenya) or from the thin streamlit_final*.py entry points.
+# CSVs, control images and clients are cached once per process and shared
+# by every country it serves, so adding a country only needs a profile in
+# profiles/survey/. ?stats=1 shows what this process has served so far.
+
+GITHUB = "https://raw.githubusercontent.com/abhipsabasu/Image_geoprofiling/main/"
+# What a refreshed page needs to carry on (see session_store.py)
+CHECKPOINT_KEYS = ("seed", "image_files", "index", "responses", "birth_country", "residence", "awareness")
+
+
+# ---- CONFIG ----
+# One parsed copy per country, shared by every session and refreshed after the TTL
+@st.cache_data(ttl=10 * 60, max_entries=8, show_spinner=False)
+def load_country_frame(country):
+    response_wiki = get_http().get(GITHUB + f'{country}_hs.csv')
+    return pd.read_csv(StringIO(response_wiki.text))
+
+
+def load_data(profile, seed, session_id):
+    """
+    The session's images: up to the profile's `num_images` sampled images
+    (fewer once the country runs low) followed by its control images
+    """
+    country = profile["country"]
+    allocator = get_allocator()
+    # The allocation table is seeded the first time this process sees the country, from
+    # the CSV on GitHub: it is the live export of the counts, so a lost table resumes from
+    # the last export instead of rolling back to a snapshot
+    if not allocator.has_country(country):
+        allocator.seed(country, load_country_frame(country))
+
+    # Draw the profile's sample weighted by remaining frequency and lease it to this session;
+    # the images are decremented when it completes
+    selected = allocator.reserve(country, session_id, profile["num_images"], seed=seed)
+    image_files = selected + profile["control_images"]
+    return image_files
+
+
+def decode_image(path):
+    # The manifest knows the display variant's path, so a pre-generated one is
+    # read directly without loading and hashing the source image
+    manifest = get_manifest()
+    display_path = manifest.display_path(path) if manifest is not None else None
+    if display_path:
+        with open(display_path, "rb") as f:
+            return f.read()
+    # Served from the checkout / local cache before falling back to GitHub raw,
+    # then shrunk to the cached display-size variant (see derivatives.py)
+    return derivatives.display_bytes(get_image_store().read(path))
+
+
+# Every session of a country ends with the same control images, so they are
+# decoded once per process instead of once per session
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_control_image(path):
+    return decode_image(path)
+
+
+class SurveyStats:
+    """
+    Per-country counters for the sessions served by this process
+    """
+
+    FIELDS = ("sessions", "responses", "completed")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def add(self, country, field, n=1):
+        with self._lock:
+            counts = self._counts.setdefault(country, dict.fromkeys(self.FIELDS, 0))
+            counts[field] += n
+
+    def table(self):
+        with self._lock:
+            return pd.DataFrame.from_dict(self._counts, orient="index", columns=list(self.FIELDS))
+
+
+@st.cache_resource(show_spinner=False)
+def get_survey_stats():
+    return SurveyStats()
+
+
+def show_stats():
+    st.title("Survey server stats")
+    st.dataframe(get_survey_stats().table())
+    st.json(get_image_store().get_stats())
+    st.json(get_http().get_stats())
+    st.write("Write-behind queue", get_write_behind().depth())
+
+
+def reset_selections():
+    st.session_state.pop("q1", None)
+    st.session_state.pop("q2", None)
+    st.session_state.pop("q3", None)
+    st.session_state.pop("q4", None)
+
+
+def save_checkpoint(country):
+    state = {key: st.session_state[key] for key in CHECKPOINT_KEYS}
+    # A completed session's images are already counted; it must never lease or commit them again
+    state["completed"] = st.session_state.completed
+    # Answers still buffered in the sink are lost with the page, so they are written again on resume
+    state["unflushed"] = st.session_state.response_sink.pending()
+    get_session_store().save(f"survey:{country}", st.session_state.prolific_id, state)
+
+
+def resume(country, saved):
+    """
+    Continue a checkpointed session with its images, answers and lease
+    """
+    for key in CHECKPOINT_KEYS:
+        st.session_state[key] = saved[key]
+    st.session_state.unflushed = saved["unflushed"]
+    st.session_state.completed = saved.get("completed", False)
+    if not st.session_state.completed:
+        # Take back any of its leases that expired, so commit() still counts every image
+        get_allocator().lease(country, st.session_state.prolific_id, st.session_state.image_files)
+
+
+def main(default_country=None):
+    if "stats" in st.query_params:
+        show_stats()
+        st.stop()
+
+    # ---- PROFILE ----
+    # A session keeps the country it started with, even if the URL changes
+    if "country" not in st.session_state:
+        st.session_state.country = st.query_params.get("country", default_country)
+    profile = get_profile("survey", st.session_state.country or "")
+    if profile is None:
+        available = ", ".join(p["country"] for p in load_profiles("survey").values())
+        st.error(f"Unknown study country. Open this page with ?country=<name>, one of: {available}")
+        st.stop()
+    country = profile["country"]
+    rating_labels = {rating["value"]: rating["label"] for rating in profile["ratings"]}
+    clue_ratings = profile["clue_ratings"]
+    stats = get_survey_stats()
+
+    # Clients are cached once per server process (see clients.py)
+    db = clients.get_db()
+
+    if "seed" not in st.session_state:
+        st.session_state.seed = random.randint(1, 200000)
+
+    # ---- SESSION STATE ----
+    if "index" not in st.session_state:
+        st.session_state.index = 0
+
+    if "prolific_id" not in st.session_state:
+        st.session_state.prolific_id = None
+
+    if "completed" not in st.session_state:
+        st.session_state.completed = False
+
+    # ---- UI ----
+    st.title("Guess the Image Origin")
+    st.markdown("""
+Please help us evaluate how well visual cues in each image indicate the mentioned country of origin.
+For each image:
+- Rate how strongly the image supports the stated country.
+- Mention any clues you used to make your judgment.
+
+After answering the questions corresponding to an image, click on *Submit and Next* once, and wait till the next image is loaded.
+""")
+    if "birth_country" not in st.session_state:
+        st.session_state.birth_country = None
+
+    if "residence" not in st.session_state:
+        st.session_state.residence = None
+
+    if "awareness" not in st.session_state:
+        st.session_state.awareness = None
+
+    if not st.session_state.prolific_id:
+        with st.form("prolific_form"):
+            pid = st.text_input("Please enter your Prolific ID to begin:", max_chars=24)
+            birth = st.text_input("Please enter your country of birth", max_chars=24)
+            res = st.text_input("Please enter your country of residence", max_chars=24)
+            awareness = st.radio(
+                f"To what extent are you aware of the country {country}?",
+                options=["Choose an option", 0, 1, 2],
+                format_func=lambda x: f"{x} . {'I am not aware about the country at all' if x==0 else 'I have some knowledge about the visuals present in the country' if x==1 else 'I am quite confident about the visuals present in the country' if x==2 else ''}",
+                key='q4',
+            )
+            submitted = st.form_submit_button("Submit")
+            if submitted:
+                if pid.strip() and birth.strip() and res.strip():
+                    st.session_state.prolific_id = pid.strip()
+                    # Checkpoint and lease are both refreshed on every submit, so they expire together
+                    saved = get_session_store().load(f"survey:{country}", st.session_state.prolific_id, max_age=LEASE_TTL)
+                    if saved:
+                        resume(country, saved)
+                        if st.session_state.completed:
+                            st.success("Welcome back! You have already completed this survey.")
+                        else:
+                            st.success(f"Welcome back! Continuing from image {saved['index'] + 1}.")
+                    else:
+                        st.session_state.birth_country = birth.strip()
+                        st.session_state.residence = res.strip()
+                        st.session_state.awareness = awareness
+                        st.success("Thank you! You may now begin the survey.")
+                    st.rerun()
+                else:
+                    st.error("Please enter a valid Prolific ID, birth country or residence country.")
+        st.stop()  # Stop further execution until ID is entered
+
+    # The selection is per session, so it lives in session state instead of a process-wide cache.
+    # Images are only leased once a Prolific ID is entered, and the lease is keyed by it,
+    # so visitors who leave at the form hold nothing and the same ID gets the same images back
+    if "image_files" not in st.session_state:
+        st.session_state.image_files = load_data(profile, st.session_state.seed, st.session_state.prolific_id)
+        stats.add(country, "sessions")
+    image_files = st.session_state.image_files
+
+    controls = set(profile["control_images"])
+
+    def load_image(path):
+        return load_control_image(path) if path in controls else decode_image(path)
+
+    # Loads the next few images in the background while the current one is answered
+    if "prefetcher" not in st.session_state:
+        st.session_state.prefetcher = ImagePrefetcher(image_files, load_image)
+
+    # --- SESSION STATE ---
+
+    if "responses" not in st.session_state:
+        st.session_state.responses = []
+
+    # Answers are stored one document per image as they are submitted
+    if "response_sink" not in st.session_state:
+        st.session_state.response_sink = ResponseSink(db, "Image_geolocalization", st.session_state.prolific_id,
+                                                     queue=get_write_behind())
+        if not st.session_state.completed:
+            st.session_state.response_sink.start({"country": country})
+        for index in st.session_state.pop("unflushed", []):
+            st.session_state.response_sink.add(index, st.session_state.responses[index])
+
+    if 'q1_index' not in st.session_state:
+        st.session_state.q1_index = 0
+    if 'q2_index' not in st.session_state:
+        st.session_state.q2_index = 0
+    if 'q4_index' not in st.session_state:
+        st.session_state.q4_index = 0
+
+    # Current image
+    if st.session_state.index < len(image_files):
+        if profile["show_progress"]:
+            st.write(f"**Image {st.session_state.index + 1} of {len(image_files)}**")
+        image_path = image_files[st.session_state.index]
+        image_name = GITHUB + image_path
+
+        try:
+            image = st.session_state.prefetcher.get(st.session_state.index)
+            st.image(image, use_container_width=True)
+        except:
+            st.error("Could not load image.")
+
+        st.markdown(f"To what extent does this image contain visual cues (e.g., local architecture, language, or scenery) that identify it as being from {country}?")
+        rating = st.radio(
+            "Select a score:",
+            options=["Choose an option"] + list(rating_labels),
+            format_func=lambda x: f"{x} . {rating_labels.get(x, '')}",
+            index=st.session_state.q1_index,
+            key='q1'
+        )
+        clue_text = None
+        if rating in clue_ratings:
+            clue_text = st.text_area("What visual clues or indicators helped you make this judgment?", height=100, key='q3')
+
+        if st.button("Submit and Next"):
+            if ((rating == 'Choose an option') or (rating in clue_ratings and clue_text in [None, ''])):
+                st.error('Answer the questions')
+            else:
+                # Save response
+                response = {
+                    "name": st.session_state.prolific_id,
+                    "birth_country": st.session_state.birth_country,
+                    "residence": st.session_state.residence,
+                    "image": image_name,
+                    "rating": rating,
+                    "clues": clue_text,
+                    "awareness": st.session_state.awareness
+                }
+                st.session_state.responses.append(response)
+                st.session_state.response_sink.add(st.session_state.index, response)
+                stats.add(country, "responses")
+                # Keep the images leased while the participant is still answering
+                get_allocator().renew(country, st.session_state.prolific_id)
+                reset_selections()
+                st.session_state.index += 1
+                st.session_state.q1_index = 0
+                st.session_state.q2_index = 0
+                st.session_state.q4_index = 0
+                save_checkpoint(country)
+                st.rerun()
+    else:
+        if not st.session_state.completed:
+            # Consume this session's leased slots in one transaction
+            allocator = get_allocator()
+            if allocator.commit(country, st.session_state.prolific_id):
+                stats.add(country, "completed")
+            # Write what is still buffered and mark the session complete
+            st.session_state.response_sink.finish(count=len(st.session_state.responses))
+            # Checkpointed as completed, so re-entering the same ID neither re-leases nor re-commits
+            st.session_state.completed = True
+            save_checkpoint(country)
+            st.session_state.prefetcher.close()
+            try:
+                # Mirrors the allocation table to <country>_hs.csv, at most every few minutes
+                export_to_github(allocator, country, queue=get_write_behind())
+            except Exception as e:
+                print(f"CSV export failed: {e}")
+        st.session_state.submitted_all = True
+        st.success("Survey complete. Thank you!")
+        st.write("✅ Survey complete! Thank you.")
+
+
+if __name__ == "__main__":
+    main()
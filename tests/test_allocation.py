@@ -0,0 +1,104 @@
+import time
+import threading
+
+import pandas as pd
+import pytest
+
+from allocation import Allocator
+
+
+@pytest.fixture
+def allocator(tmp_path):
+    allocator = Allocator(path=str(tmp_path / "allocation.sqlite3"))
+    # 20 images, each owed one more annotation
+    allocator.seed("Kenya", pd.DataFrame({"file_path": [f"img/{i}.jpg" for i in range(20)], "frequency": 1}))
+    return allocator
+
+
+def frequencies(allocator):
+    return allocator.snapshot("Kenya").set_index("file_path")["frequency"]
+
+
+def test_reserve_is_stable_per_session(allocator):
+    first = allocator.reserve("Kenya", "PID1", 5, seed=1)
+    assert len(first) == 5
+    assert allocator.reserve("Kenya", "PID1", 5, seed=2) == first
+
+
+def test_sessions_never_share_a_slot(allocator):
+    first = allocator.reserve("Kenya", "PID1", 8, seed=1)
+    second = allocator.reserve("Kenya", "PID2", 8, seed=1)
+    assert not set(first) & set(second)
+    # Only 4 slots are left for a third session
+    assert len(allocator.reserve("Kenya", "PID3", 8, seed=1)) == 4
+
+
+def test_commit_decrements_once(allocator):
+    images = allocator.reserve("Kenya", "PID1", 5, seed=1)
+    assert allocator.commit("Kenya", "PID1") == 5
+    assert allocator.commit("Kenya", "PID1") == 0
+    counts = frequencies(allocator)
+    assert (counts[images] == 0).all()
+    assert counts.sum() == 15
+
+
+def test_release_and_expiry_return_images(allocator):
+    allocator.reserve("Kenya", "PID1", 20, seed=1)
+    assert allocator.reserve("Kenya", "PID2", 5, seed=1) == []
+    allocator.release("Kenya", "PID1")
+    assert len(allocator.reserve("Kenya", "PID2", 5, seed=1)) == 5
+
+    short = Allocator(path=allocator.path, ttl=0.01)
+    short.reserve("Kenya", "PID3", 15, seed=1)
+    time.sleep(0.05)
+    # PID3's leases expired, so the 15 images are available again
+    assert len(short.reserve("Kenya", "PID4", 15, seed=1)) == 15
+    assert short.commit("Kenya", "PID3") == 0
+
+
+def test_renew_keeps_the_lease(allocator):
+    short = Allocator(path=allocator.path, ttl=0.2)
+    images = short.reserve("Kenya", "PID1", 5, seed=1)
+    time.sleep(0.1)
+    short.renew("Kenya", "PID1")
+    time.sleep(0.15)
+    assert short.reserve("Kenya", "PID1", 5, seed=9) == images
+
+
+def test_concurrent_sessions_do_not_overbook(allocator):
+    results = {}
+
+    def take(pid):
+        results[pid] = Allocator(path=allocator.path).reserve("Kenya", pid, 3, seed=None)
+
+    threads = [threading.Thread(target=take, args=(f"PID{i}",)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    leased = [path for images in results.values() for path in images]
+    assert len(leased) == len(set(leased)) == 20
+
+    for pid in results:
+        allocator.commit("Kenya", pid)
+    assert frequencies(allocator).sum() == 0
+
+
+def test_lease_restores_expired_images(allocator):
+    short = Allocator(path=allocator.path, ttl=0.01)
+    images = short.reserve("Kenya", "PID1", 5, seed=1)
+    time.sleep(0.05)
+    # A resumed session takes back its images, controls have no slot and are skipped
+    assert allocator.lease("Kenya", "PID1", images + ["control.jpg"]) == 5
+    assert allocator.lease("Kenya", "PID1", images) == 0
+    assert allocator.reserve("Kenya", "PID1", 5, seed=2) == images
+    assert allocator.commit("Kenya", "PID1") == 5
+
+
+def test_lease_skips_slots_without_capacity(allocator):
+    images = allocator.reserve("Kenya", "PID1", 5, seed=1)
+    assert allocator.commit("Kenya", "PID1") == 5
+    # The slots are used up, so leasing them again takes nothing
+    assert allocator.lease("Kenya", "PID1", images) == 0
+    assert allocator.commit("Kenya", "PID1") == 0
+    assert frequencies(allocator).sum() == 15
@@ -0,0 +1,65 @@
+import threading
+
+import firebase_admin
+import pytest
+from firebase_admin import credentials
+from google.api_core import exceptions as google_exceptions
+from google.auth.credentials import AnonymousCredentials
+
+import clients
+
+
+class FakeCertificate(credentials.Base):
+    project_id = "test-project"
+
+    def get_credential(self):
+        return AnonymousCredentials()
+
+
+@pytest.fixture
+def firebase(monkeypatch):
+    monkeypatch.setattr(clients, "get_secrets", lambda: {})
+    monkeypatch.setattr(clients, "get_cred_dict", lambda secrets: {})
+    monkeypatch.setattr(clients.credentials, "Certificate", lambda cred: FakeCertificate())
+    monkeypatch.setattr(clients, "_refreshed_at", float("-inf"))
+    clients.get_db.clear()
+    yield
+    clients.get_db.clear()
+    for app in list(firebase_admin._apps.values()):
+        firebase_admin.delete_app(app)
+
+
+def test_refresh_rebuilds_the_client(firebase):
+    db = clients.get_db()
+    assert clients.get_db() is db
+    assert clients.refresh()
+    assert clients.get_db() is not db
+
+
+def test_concurrent_stale_errors_refresh_once(firebase, monkeypatch):
+    db = clients.get_db()
+    refreshed, errors = [], []
+    barrier = threading.Barrier(8)
+    _refresh = clients.refresh
+
+    def counting(*args, **kwargs):
+        done = _refresh(*args, **kwargs)
+        refreshed.append(done)
+        return done
+
+    def fail():
+        barrier.wait()
+        try:
+            clients.refresh_on_error(google_exceptions.ServiceUnavailable("down"))
+        except Exception as e:
+            errors.append(e)
+
+    monkeypatch.setattr(clients, "refresh", counting)
+    threads = [threading.Thread(target=fail) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert refreshed.count(True) == 1
+    assert clients.get_db() is not db
@@ -0,0 +1,53 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+import exif
+
+XMP = b'<x:xmpmeta><rdf:Description exif:GPSLatitude="46,3.4N"/></x:xmpmeta>'
+
+
+def photo(fmt="JPEG"):
+    tags = Image.Exif()
+    tags.get_ifd(exif.EXIF_IFD)[exif.DATETIME_ORIGINAL] = "2019:03:14 10:11:12"
+    gps = tags.get_ifd(exif.GPS_IFD)
+    gps[1], gps[2], gps[3], gps[4] = "N", (46.0, 3.0, 25.0), "E", (14.0, 30.0, 21.0)
+    buf = BytesIO()
+    if fmt == "JPEG":
+        Image.new("RGB", (64, 48), "red").save(buf, fmt, exif=tags.tobytes(), xmp=XMP)
+    else:
+        Image.new("RGB", (64, 48), "red").save(buf, fmt, exif=tags.tobytes())
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_strip_removes_gps(fmt):
+    data = photo(fmt)
+    assert exif.read_exif(data)["lat"] is not None
+    stripped = exif.strip_metadata(data)
+    assert exif.read_exif(stripped)["lat"] is None
+    assert Image.open(BytesIO(stripped)).size == (64, 48)
+
+
+def test_strip_removes_xmp_and_keeps_the_date():
+    data = photo()
+    assert exif.XMP_HEADER in data
+    stripped = exif.strip_metadata(data)
+    assert exif.XMP_HEADER not in stripped and b"GPSLatitude" not in stripped
+    assert exif.taken_month_year(exif.read_exif(stripped)) == ("March", "2019")
+
+
+def test_unparsable_header_is_reencoded_without_metadata():
+    data = photo()
+    # An EXIF segment whose TIFF header is garbage, followed by the real image
+    bad = b"\xff\xd8\xff\xe1\x00\x0aExif\x00\x00XXXX" + data[2:]
+    stripped = exif.strip_metadata(bad)
+    assert exif.read_exif(stripped)["lat"] is None
+    assert exif.XMP_HEADER not in stripped
+    assert Image.open(BytesIO(stripped)).size == (64, 48)
+
+
+def test_corrupt_input_is_rejected():
+    with pytest.raises(ValueError):
+        exif.strip_metadata(b"\xff\xd8\xff\xe1\x00\x20Exif\x00\x00" + b"\x00" * 200)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from image_storage import LocalStorage, S3Storage, build_storage
+
+
+@pytest.fixture
+def spooled(tmp_path):
+    def write(name, size):
+        path = tmp_path / name
+        path.write_bytes(os.urandom(size))
+        return str(path)
+    return write
+
+
+def test_local_storage_records_relative_paths(tmp_path, spooled):
+    storage = LocalStorage(str(tmp_path / "procured"))
+    source = spooled("photo", 1000)
+    assert storage.push("Kenya_images/PID_0.png", source) == "Kenya_images/PID_0.png"
+    with open(tmp_path / "procured" / "Kenya_images" / "PID_0.png", "rb") as f, open(source, "rb") as g:
+        assert f.read() == g.read()
+    assert storage.url("Kenya_images/PID_0.png") == "Kenya_images/PID_0.png"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    # moto stands in for an S3-compatible service such as MinIO; boto3 is optional
+    boto3 = pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="images")
+        yield boto3.client("s3", region_name="us-east-1")
+
+
+def test_s3_storage_uploads_small_and_multipart_files(s3, spooled):
+    storage = build_storage({"image_storage": "s3", "s3_bucket": "images", "s3_prefix": "study/", "s3_region": "us-east-1"})
+    assert isinstance(storage, S3Storage)
+    for name, size in [("small", 1000), ("large", 20 * 1024 * 1024)]:
+        source = spooled(name, size)
+        key = storage.push(f"Kenya_images/{name}.png", source)
+        assert key == f"study/Kenya_images/{name}.png"
+        stored = s3.get_object(Bucket="images", Key=key)
+        with open(source, "rb") as f:
+            assert stored["Body"].read() == f.read()
+    # Above MULTIPART_CHUNK the file went up in parts
+    assert s3.head_object(Bucket="images", Key="study/Kenya_images/large.png")["ETag"].strip('"').endswith("-3")
+    assert storage.url("Kenya_images/small.png") == "s3://images/study/Kenya_images/small.png"
+
+
+def test_unknown_storage_is_rejected():
+    with pytest.raises(ValueError):
+        build_storage({"image_storage": "ftp"})
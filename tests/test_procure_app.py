@@ -0,0 +1,93 @@
+from io import BytesIO
+from unittest import mock
+
+import pytest
+import streamlit
+from PIL import Image
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+import clients
+import exif
+import procure_app
+from image_storage import LocalStorage
+from session_store import SessionStore
+from upload_spool import UploadSpool
+
+CORRUPT = b"\xff\xd8\xff\xe1\x00\x20Exif\x00\x00" + b"\x00" * 200
+
+
+def photo():
+    tags = Image.Exif()
+    tags.get_ifd(exif.EXIF_IFD)[exif.DATETIME_ORIGINAL] = "2019:03:14 10:11:12"
+    gps = tags.get_ifd(exif.GPS_IFD)
+    gps[1], gps[2], gps[3], gps[4] = "N", (48.0, 8.0, 0.0), "E", (17.0, 6.0, 0.0)
+    buf = BytesIO()
+    Image.new("RGB", (640, 480), "red").save(buf, "JPEG", exif=tags.tobytes())
+    return buf.getvalue()
+
+
+class Upload:
+    def __init__(self, data):
+        self.data = data
+        self.file_id = str(hash(data))
+
+    def getvalue(self):
+        return self.data
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """
+    The Slovakia procurement page with local state; the uploader returns what is put in the list
+    """
+    files = []
+    spool = UploadSpool(root=str(tmp_path / "spool"))
+    sessions = SessionStore(path=str(tmp_path / "sessions.sqlite3"))
+    monkeypatch.setattr(clients, "get_db", lambda: mock.MagicMock())
+    monkeypatch.setattr(clients, "get_secrets", lambda: {})
+    monkeypatch.setattr(procure_app, "get_session_store", lambda: sessions)
+    monkeypatch.setattr(procure_app, "get_storage", lambda: LocalStorage(str(tmp_path / "images")))
+    monkeypatch.setattr(procure_app, "get_spool", lambda: spool)
+    monkeypatch.setattr(procure_app, "get_write_behind", lambda: mock.MagicMock())
+    monkeypatch.setattr(streamlit, "file_uploader", lambda *args, **kwargs: files[-1] if files else None)
+    return files
+
+
+def start():
+    at = AppTest.from_string("import procure_app\nprocure_app.main('Slovakia')", default_timeout=30).run()
+    at.text_input[0].input("PID1")
+    at.text_input[1].input("Slovakia")
+    at.text_input[2].input("Slovakia")
+    return at.button[0].click().run()
+
+
+def test_exif_date_prefills_unanswered_questions(uploads):
+    at = start()
+    # The date questions are on the page before anything is uploaded
+    assert at.selectbox(key="q6_month_0").value == "Choose an option"
+    uploads.append(Upload(photo()))
+    at.run()
+    assert not at.exception
+    assert at.selectbox(key="q6_month_0").value == "March"
+    assert at.selectbox(key="q6_year_0").value == "2019"
+
+
+def test_exif_date_keeps_answers_given_before_upload(uploads):
+    at = start()
+    at.selectbox(key="q6_month_0").set_value("July").run()
+    uploads.append(Upload(photo()))
+    at.run()
+    assert at.selectbox(key="q6_month_0").value == "July"
+    assert at.selectbox(key="q6_year_0").value == "2019"
+
+
+def test_corrupt_upload_is_rejected(uploads):
+    at = start()
+    uploads.append(Upload(CORRUPT))
+    at.run()
+    assert not at.exception
+    assert "Could not read this image. Please upload a JPG or PNG photo." in [e.value for e in at.error]
+    (upload,) = at.session_state.uploads.values()
+    assert upload["spool"] is None
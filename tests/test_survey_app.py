@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+import allocation
+import clients
+import session_store
+import survey_app
+from allocation import Allocator
+from session_store import SessionStore
+
+KENYA_IMAGES = 60
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """
+    The Kenya survey with local state, no Firestore, GitHub or image downloads
+    """
+    allocator = Allocator(path=str(tmp_path / "allocation.sqlite3"))
+    sessions = SessionStore(path=str(tmp_path / "sessions.sqlite3"))
+    frame = pd.DataFrame({"file_path": [f"Kenya_images/{i}.jpg" for i in range(KENYA_IMAGES)], "frequency": 3})
+    monkeypatch.setattr(clients, "get_db", lambda: mock.MagicMock())
+    monkeypatch.setattr(survey_app, "get_allocator", lambda: allocator)
+    monkeypatch.setattr(allocation, "get_allocator", lambda: allocator)
+    monkeypatch.setattr(survey_app, "get_session_store", lambda: sessions)
+    monkeypatch.setattr(session_store, "get_session_store", lambda: sessions)
+    monkeypatch.setattr(survey_app, "load_country_frame", lambda country: frame)
+    monkeypatch.setattr(survey_app, "decode_image", lambda path: b"")
+    monkeypatch.setattr(survey_app, "load_control_image", lambda path: b"")
+    monkeypatch.setattr(survey_app, "get_write_behind", lambda: mock.MagicMock())
+    monkeypatch.setattr(survey_app, "export_to_github", mock.MagicMock())
+    monkeypatch.setattr(survey_app, "ImagePrefetcher", mock.MagicMock())
+    return allocator
+
+
+def enter(prolific_id):
+    at = AppTest.from_string("import survey_app\nsurvey_app.main('Kenya')", default_timeout=30).run()
+    at.text_input[0].input(prolific_id)
+    at.text_input[1].input("Kenya")
+    at.text_input[2].input("Kenya")
+    at.radio[0].set_value(1)
+    return at.button[0].click().run()
+
+
+def remaining(allocator):
+    return allocator.snapshot("Kenya")["frequency"].sum()
+
+
+def test_reentering_a_completed_session_changes_no_counts(app):
+    at = enter("PID1")
+    for _ in range(len(at.session_state.image_files)):
+        at.radio[0].set_value(0)
+        at.button[0].click().run()
+    assert not at.exception
+    assert at.session_state.completed
+    after = remaining(app)
+    assert after == 3 * KENYA_IMAGES - 50
+
+    # Same Prolific ID in a new browser session
+    again = enter("PID1")
+    assert not again.exception
+    assert again.session_state.completed
+    assert remaining(app) == after
+    assert app.commit("Kenya", "PID1") == 0
+
+
+def test_country_running_low_serves_a_partial_session(app, monkeypatch):
+    frame = pd.DataFrame({"file_path": [f"Kenya_images/{i}.jpg" for i in range(8)], "frequency": 1})
+    monkeypatch.setattr(survey_app, "load_country_frame", lambda country: frame)
+    at = enter("PID1")
+    assert not at.exception
+    # The 8 images still owed an annotation, then the two control images
+    assert len(at.session_state.image_files) == 8 + 2
+    assert "**Image 1 of 10**" in [m.value for m in at.markdown]
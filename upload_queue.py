@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures, FIRST_COMPLETED
+
+UPLOAD_WORKERS = 2
+
+
+class UploadQueue:
+    """
+    Per-session background upload queue. Each image is handed to
+    `uploader.push(path, source)` as soon as it is submitted, so network I/O
+    overlaps with the participant answering the next image and the final
+    page only waits for whatever is still in flight.
+    """
+
+    def __init__(self, uploader, workers=UPLOAD_WORKERS):
+        self.uploader = uploader
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload")
+        self._futures = {}  # repo path -> Future
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def submit(self, path, source, result=None):
+        """
+        Start pushing `source` to `path`. A `result` from an earlier push of
+        the same file (e.g. in a resumed session) is reused instead.
+        """
+        with self._lock:
+            self._sources[path] = source
+            if result is not None:
+                future = Future()
+                future.set_result(result)
+            else:
+                future = self._executor.submit(self.uploader.push, path, source)
+            self._futures[path] = future
+
+    def done(self):
+        """
+        {path: result} of the pushes that already succeeded
+        """
+        with self._lock:
+            return {path: future.result() for path, future in self._futures.items()
+                    if future.done() and future.exception() is None}
+
+    def pending(self):
+        with self._lock:
+            return sum(not future.done() for future in self._futures.values())
+
+    def __len__(self):
+        return len(self._futures)
+
+    def wait(self, progress=None):
+        """
+        Block until every submitted upload has finished. Uploads that failed
+        in the background get one more attempt here.
+
+        `progress(done, total)` is called from the calling thread. Returns
+        ({path: result}, {path: error}).
+        """
+        with self._lock:
+            for path, future in self._futures.items():
+                if future.done() and future.exception() is not None:
+                    self._futures[path] = self._executor.submit(self.uploader.push, path, self._sources[path])
+            futures = dict(self._futures)
+
+        total = len(futures)
+        remaining = {future for future in futures.values() if not future.done()}
+        if progress and total:
+            progress(total - len(remaining), total)
+        while remaining:
+            done, remaining = wait_futures(remaining, return_when=FIRST_COMPLETED)
+            if progress:
+                progress(total - len(remaining), total)
+
+        results = {}
+        failures = {}
+        for path, future in futures.items():
+            if future.exception() is not None:
+                failures[path] = future.exception()
+            else:
+                results[path] = future.result()
+        return results, failures
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,117 @@
+import os
+import time
+import base64
+import hashlib
+
+import streamlit as st
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SPOOL_DIR = os.path.join(BASE_DIR, ".cache", "spool")
+SPOOL_MAX_AGE = 7 * 24 * 60 * 60
+CHUNK_SIZE = 3 * 16 * 1024  # multiple of 3 so chunks encode without padding
+
+
+class UploadSpool:
+    """
+    Content-addressed spool of accepted uploads. Each image is written once
+    as raw bytes; session state only keeps the small handle returned by put().
+    """
+
+    def __init__(self, root=SPOOL_DIR, max_age=SPOOL_MAX_AGE):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.prune(max_age)
+
+    def path(self, handle):
+        digest = handle["digest"]
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data, digest=None):
+        # `digest` skips re-hashing bytes whose sha256 the caller already has
+        handle = {"digest": digest or hashlib.sha256(data).hexdigest(), "size": len(data)}
+        path = self.path(handle)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return handle
+
+    def read(self, handle):
+        with open(self.path(handle), "rb") as f:
+            return f.read()
+
+    def exists(self, handle):
+        return os.path.exists(self.path(handle))
+
+    def prune(self, max_age=SPOOL_MAX_AGE):
+        # Spooled files are only needed until the participant's batch is stored
+        cutoff = time.time() - max_age
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                full = os.path.join(dirpath, name)
+                try:
+                    if os.path.getmtime(full) < cutoff:
+                        os.remove(full)
+                except FileNotFoundError:
+                    pass
+
+
+class Base64Stream:
+    """
+    Read-only file object that base64-encodes a file on the fly, optionally
+    wrapped in `prefix`/`suffix` bytes (e.g. a JSON envelope). It has a length,
+    so requests sends it with a Content-Length instead of holding the encoded
+    string in memory.
+    """
+
+    def __init__(self, path, prefix=b"", suffix=b""):
+        self.path = path
+        self.prefix = prefix
+        self.suffix = suffix
+        size = os.path.getsize(path)
+        self._length = len(prefix) + 4 * ((size + 2) // 3) + len(suffix)
+        self.seek(0)
+
+    def __len__(self):
+        return self._length
+
+    def _chunks(self):
+        yield self.prefix
+        with open(self.path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield base64.b64encode(chunk)
+        yield self.suffix
+
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0:
+            raise OSError("Base64Stream can only be rewound")
+        self._chunks_iter = self._chunks()
+        self._buffer = b""
+        self._position = 0
+        return 0
+
+    def tell(self):
+        return self._position
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks_iter, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            out, self._buffer = self._buffer, b""
+        else:
+            out, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._position += len(out)
+        return out
+
+
+@st.cache_resource(show_spinner=False)
+def get_spool():
+    return UploadSpool()
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import random
+import argparse
+import importlib
+import threading
+
+import streamlit as st
+
+from state_db import STATE_DIR, connect, init
+
+JOURNAL_PATH = os.path.join(STATE_DIR, "write_behind.sqlite3")
+WORKERS = 2
+MAX_ATTEMPTS = 8  # after this a job is parked as dead, never dropped
+BACKOFF_BASE = 2
+BACKOFF_MAX = 5 * 60
+LEASE = 2 * 60  # a claimed job whose worker died is retried after this
+POLL_INTERVAL = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_at REAL NOT NULL,
+    locked_until REAL NOT NULL DEFAULT 0,
+    dead INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (key, id);
+"""
+
+
+def resolve(kind):
+    """
+    The handler for a job kind, "module:function"; resolved when the job runs
+    so jobs journaled before a restart find their handler without any setup
+    """
+    module, _, name = kind.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+class WriteBehindQueue:
+    """
+    Process-wide write-behind queue for remote persistence (Firestore,
+    GitHub). submit() appends the job to a SQLite journal and returns at
+    once; worker threads run the registered handler, retry failures with
+    exponential backoff and delete a job only once it succeeded, so jobs
+    survive transient outages and server restarts.
+
+    Jobs that share a `key` (e.g. one Firestore document) run in submit order.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, workers=WORKERS, max_attempts=MAX_ATTEMPTS, start=True):
+        self.path = path
+        self.max_attempts = max_attempts
+        init(path, SCHEMA)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        if start:
+            for i in range(workers):
+                thread = threading.Thread(target=self._run, name=f"write-behind-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _connect(self):
+        return connect(self.path)
+
+    def submit(self, kind, payload, key=""):
+        """
+        Journal a job and return its id. `kind` is the handler
+        ("module:function", called with the payload); `payload` must be
+        JSON-serializable.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, key, payload, next_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, json.dumps(payload), now, now)
+            ).lastrowid
+        self._wake.set()
+        return job_id
+
+    def depth(self):
+        """
+        {"pending": jobs waiting or running, "dead": jobs that ran out of attempts}
+        """
+        with self._connect() as conn:
+            pending, dead = conn.execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead = 1), 0) FROM jobs"
+            ).fetchone()
+        return {"pending": pending, "dead": dead}
+
+    def _claim(self):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT id, kind, payload, attempts FROM jobs j
+                WHERE dead = 0 AND next_at <= ? AND locked_until <= ?
+                  AND NOT EXISTS (SELECT 1 FROM jobs e WHERE e.key = j.key AND e.id < j.id AND e.dead = 0)
+                ORDER BY id LIMIT 1
+            """, (now, now)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET locked_until = ? WHERE id = ?", (now + LEASE, row[0]))
+            return row
+
+    def run_once(self):
+        """
+        Run one due job; False if there was none
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        job_id, kind, payload, attempts = job
+        try:
+            resolve(kind)(json.loads(payload))
+        except Exception as e:
+            attempts += 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+            dead = int(attempts >= self.max_attempts)
+            print(f"Write-behind job {job_id} ({kind}) failed, attempt {attempts}: {e}")
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE jobs SET attempts = ?, next_at = ?, locked_until = 0, dead = ?, last_error = ? WHERE id = ?",
+                    (attempts, time.time() + delay, dead, repr(e), job_id)
+                )
+        else:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return True
+
+    def drain(self, timeout=None):
+        """
+        Run due jobs on the calling thread until none is left (CLI / tests)
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while self.run_once():
+            if deadline is not None and time.time() > deadline:
+                break
+
+    def retry_dead(self):
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET dead = 0, attempts = 0, next_at = ? WHERE dead = 1", (time.time(),)).rowcount
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                print(f"Write-behind worker error: {e}")
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+
+
+@st.cache_resource(show_spinner=False)
+def get_write_behind():
+    return WriteBehindQueue()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or drain the write-behind journal")
+    parser.add_argument("--drain", action="store_true", help="run every due job now")
+    parser.add_argument("--retry-dead", action="store_true", help="give dead jobs a fresh set of attempts")
+    args = parser.parse_args()
+    queue = WriteBehindQueue(start=False)
+    if args.retry_dead:
+        print(f"{queue.retry_dead()} dead jobs requeued")
+    if args.drain:
+        queue.drain()
+    print(queue.depth())